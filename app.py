@@ -11,8 +11,18 @@ import time
 import random
 import subprocess
 import sys
+import json
 from datetime import datetime
-from whatsapp_engine import WhatsAppBot
+from whatsapp_engine import WhatsAppBot, PARALLEL_VALIDATION_THRESHOLD, PHONE_CACHE, SELECTOR_REGISTRY
+from lead_loader import read_sample, clean_upload, should_stream, upload_hash, PREVIEW_ROWS
+from column_detection import detect_columns
+from contact_history import CONTACT_HISTORY
+from suppression_list import SUPPRESSION_LIST
+from campaign_journal import CAMPAIGN_JOURNAL, campaign_id
+from results_export import results_path
+from browser_host import ensure_browser_host, stop_browser_host, host_info
+from request_filter import read_filter_stats
+from campaign_worker import CAMPAIGN_JOBS, ACTIVE_JOB_STATES, TELEMETRY_REFRESH_SECONDS, submit_campaign, ensure_worker
 
 # ==================== CLOUD DEPLOYMENT FIX ====================
 def install_playwright_browsers():
@@ -36,7 +46,6 @@ def install_playwright_browsers():
 
 # Run the installer at startup
 install_playwright_browsers()
-import io
 
 # ==================== PAGE CONFIGURATION ====================
 st.set_page_config(
@@ -710,6 +719,10 @@ if 'campaign_results' not in st.session_state:
     st.session_state.campaign_results = None
 if 'campaign_running' not in st.session_state:
     st.session_state.campaign_running = False
+if 'campaign_job' not in st.session_state:
+    st.session_state.campaign_job = None
+if 'campaign_error' not in st.session_state:
+    st.session_state.campaign_error = None
 
 # ==================== HEADER ====================
 st.markdown('<h1 class="main-header">📱 FireHox WhatsApp Outreach</h1>', unsafe_allow_html=True)
@@ -766,20 +779,76 @@ with col3:
 
 st.divider()
 
-# ==================== STEP 1: CONNECTION (OPEN-CLOSE ARCHITECTURE) ====================
+# ==================== CAMPAIGN MONITOR ====================
+@st.fragment(run_every=TELEMETRY_REFRESH_SECONDS)
+def campaign_monitor(job_id, campaign, total_leads):
+    """
+    Live view of a background campaign - reruns on its own at the telemetry
+    refresh rate, not the whole page. Rendering cost is fixed: one job row with a
+    bounded console buffer, however long the campaign has been running.
+    """
+    job = CAMPAIGN_JOBS.job(job_id)
+    if job is None:
+        st.session_state.campaign_running = False
+        st.session_state.campaign_job = None
+        st.rerun(scope="app")
+    
+    if job['state'] not in ACTIVE_JOB_STATES:
+        st.session_state.campaign_running = False
+        st.session_state.campaign_job = None
+        if job['state'] == 'done':
+            # Results include leads processed by earlier (interrupted) runs
+            st.session_state.campaign_results = WhatsAppBot.compact_leads(CAMPAIGN_JOURNAL.results(campaign))
+        else:
+            st.session_state.campaign_error = job['message']
+        st.rerun(scope="app")
+    
+    # A worker killed mid-campaign (OOM, crash) leaves its job 'running' with nobody
+    # to run it - a new worker re-queues the job and resumes it from the journal
+    restarted, _ = ensure_worker()
+    if restarted:
+        st.warning("♻️ The campaign worker stopped unexpectedly and was restarted - the campaign resumes where it left off")
+    
+    st.progress(min(job['processed'] / total_leads, 1.0) if total_leads else 1.0)
+    # The worker publishes the cooldown end once; the countdown is computed here
+    cooldown_left = int(job['cooldown_until'] - time.time()) if job['cooldown_until'] else 0
+    if cooldown_left > 0:
+        st.warning(f"⏳ **Cooling down...** {cooldown_left // 60}m {cooldown_left % 60}s remaining (Anti-Ban Protection)")
+    else:
+        st.info(job['message'])
+    
+    metrics_cols = st.columns(3)
+    metrics_cols[0].metric("✅ Sent", job['sent'])
+    metrics_cols[1].metric("❌ Failed", job['failed'])
+    metrics_cols[2].metric("📊 Progress", f"{job['processed']}/{total_leads}")
+    
+    # Live console (the worker's ring buffer of recent events)
+    st.markdown("### 🖥️ Live Console")
+    console_logs = [
+        f'<span class="console-{kind}">{text}</span>'
+        for kind, text in json.loads(job['events'] or '[]')
+    ]
+    st.markdown('<div class="live-console">' + '<br>'.join(console_logs) + '</div>', unsafe_allow_html=True)
+    
+    if job['cancel_requested']:
+        st.warning("⏹️ Stopping after the current lead...")
+    elif st.button("⏹️ Stop Campaign", width="stretch"):
+        CAMPAIGN_JOBS.cancel(job_id)
+
+# ==================== STEP 1: CONNECTION (WARM BROWSER HOST) ====================
 if st.session_state.step == 1:
     st.markdown('<h2 class="step-header">Step 1: Initialize & Login</h2>', unsafe_allow_html=True)
     
     st.markdown("""
     <div class="info-box">
-        <strong>📋 How This Works (Open-Close-Reopen Architecture):</strong><br><br>
+        <strong>📋 How This Works (Warm Browser Host):</strong><br><br>
         1️⃣ Click <strong>"🚀 Initialize & Login"</strong> below<br>
         2️⃣ A browser window will open automatically<br>
         3️⃣ <strong>Scan the QR code</strong> with your phone (if first time)<br>
         4️⃣ Wait for your chats to load completely<br>
-        5️⃣ Click <strong>"✅ Login Complete"</strong> - <strong>The browser will close automatically</strong><br>
+        5️⃣ Click <strong>"✅ Login Complete"</strong><br>
         6️⃣ Your login is now saved! Proceed to Step 2<br><br>
-        <strong>⚠️ Important:</strong> The browser MUST close after login to release the lock. This is normal behavior!
+        <strong>⚠️ Important:</strong> The browser stays open in the background with WhatsApp Web loaded, so campaigns start instantly. Don't close it - use "🔄 Reset Session" to shut it down.
     </div>
     """, unsafe_allow_html=True)
     
@@ -812,14 +881,42 @@ if st.session_state.step == 1:
         • Ensure no antivirus is blocking Playwright
         </div>
         """, unsafe_allow_html=True)
+        
+        # Which WhatsApp Web selectors are actually matching (the latest winner is tried first)
+        st.markdown("**🎯 Selector Diagnostics**")
+        selector_rows = [
+            {
+                'Element': role,
+                'Selector': selector,
+                'Hits': hits,
+                'Avg Latency (ms)': avg_ms,
+                'Element Hit Rate': f"{role_stats['hit_rate']:.0%} of {role_stats['lookups']}",
+            }
+            for role, role_stats in SELECTOR_REGISTRY.stats().items()
+            for selector, hits, avg_ms in role_stats['selectors']
+        ]
+        st.dataframe(pd.DataFrame(selector_rows), hide_index=True, width="stretch")
+        
+        # Requests the background browser skipped (avatars, media, fonts) this session
+        filter_stats = read_filter_stats()
+        if filter_stats:
+            st.caption(
+                f"🌐 Request filter (since {filter_stats['started_at']}): "
+                f"{filter_stats['blocked_requests']:,} of "
+                f"{filter_stats['blocked_requests'] + filter_stats['allowed_requests']:,} requests blocked, "
+                f"~{filter_stats['estimated_bytes_saved'] / 1e6:.1f} MB saved"
+            )
     
     col1, col2, col3 = st.columns([1, 1, 1])
     
     with col1:
         if st.button("🚀 Initialize & Login", type="primary", width="stretch"):
             with st.spinner("🔄 Launching browser..."):
+                # The browser host owns the browser; this session only attaches to it
+                success, message, endpoint = ensure_browser_host()
                 bot = WhatsAppBot()
-                success, message, page = bot.launch_browser()
+                if success:
+                    success, message, page = bot.attach_browser(endpoint)
                 
                 if success:
                     st.session_state.bot = bot
@@ -874,22 +971,30 @@ if st.session_state.step == 1:
                     st.markdown(f'<div class="error-box"><strong>Error:</strong><br>{error_html}</div>', unsafe_allow_html=True)
     
     with col2:
-        if st.button("✅ Login Complete - Close Browser", type="secondary", width="stretch"):
+        if st.button("✅ Login Complete", type="secondary", width="stretch"):
+            if not st.session_state.bot:
+                # App restarted since Initialize - reattach to the browser if it is still running
+                # (starting a new one is left to "Initialize & Login")
+                running_host = host_info()
+                if running_host is not None and running_host.get('state') == 'ready':
+                    bot = WhatsAppBot()
+                    if bot.attach_browser(running_host['endpoint'])[0]:
+                        st.session_state.bot = bot
             if st.session_state.bot:
                 with st.spinner("🔍 Verifying login (this should be quick)..."):
                     # Verify login with shorter timeout (15 seconds)
                     logged_in, msg = st.session_state.bot.verify_login(timeout=15)
                     
                     if logged_in:
-                        # CRITICAL: Close browser to release lock
+                        # Detach - the browser host keeps WhatsApp Web loaded for the campaign
                         st.session_state.bot.close_browser()
                         
                         st.session_state.browser_ready = True
                         st.session_state.bot = None  # Clear bot instance
                         st.session_state.step = 2
                         
-                        st.success("✅ Login verified! Browser closed. Your session is saved!")
-                        st.info("🔒 The browser has been closed to release the lock. You can now proceed to Step 2.")
+                        st.success("✅ Login verified! Your session is saved!")
+                        st.info("🔒 WhatsApp Web stays loaded in the background browser. You can now proceed to Step 2.")
                         time.sleep(2)
                         st.rerun()
                     else:
@@ -906,10 +1011,9 @@ if st.session_state.step == 1:
                 st.markdown("""
                 <div class="error-box">
                     <strong>❌ Session Lost</strong><br><br>
-                    The app was restarted and lost connection to the browser.<br><br>
+                    No running browser was found (it may have been closed).<br><br>
                     <strong>Solution:</strong><br>
-                    1. Close the existing browser window manually<br>
-                    2. Click "🚀 Initialize & Login" again<br><br>
+                    Click "🚀 Initialize & Login" again<br><br>
                     <strong>OR</strong><br><br>
                     If you can see your WhatsApp chats, use the <strong>"⚡ Skip Verification"</strong> button below to proceed directly!
                 </div>
@@ -918,6 +1022,12 @@ if st.session_state.step == 1:
     with col3:
         if st.button("🔄 Reset Session", width="stretch"):
             with st.spinner("🔄 Resetting session..."):
+                if st.session_state.bot:
+                    st.session_state.bot.close_browser()
+                # The host owns the profile - it must let go before the profile is deleted
+                host_stopped, host_msg = stop_browser_host()
+                if not host_stopped:
+                    st.warning(host_msg)
                 bot = WhatsAppBot()
                 success, msg = bot.reset_session()
                 if success:
@@ -943,27 +1053,17 @@ if st.session_state.step == 1:
     with col_bypass2:
         if st.button("⚡ Skip Verification & Proceed to Step 2", type="primary", width="stretch"):
             if st.session_state.bot:
-                # Close browser to release lock
+                # Detach - the browser host keeps running
                 st.session_state.bot.close_browser()
-                
-                st.session_state.browser_ready = True
-                st.session_state.bot = None  # Clear bot instance
-                st.session_state.step = 2
-                
-                st.success("✅ Skipped verification! Browser closed. Proceeding to Step 2...")
-                st.warning("⚠️ Your login session has been saved!")
-                time.sleep(1)
-                st.rerun()
-            else:
-                # Browser is open but session state was lost
-                # Just proceed to Step 2 and tell user to close browser manually
-                st.session_state.browser_ready = True
-                st.session_state.step = 2
-                
-                st.success("✅ Proceeding to Step 2...")
-                st.warning("⚠️ Please close the browser window manually before proceeding to Step 3!")
-                time.sleep(1)
-                st.rerun()
+            
+            st.session_state.browser_ready = True
+            st.session_state.bot = None  # Clear bot instance
+            st.session_state.step = 2
+            
+            st.success("✅ Skipped verification! Proceeding to Step 2...")
+            st.warning("⚠️ Your login session has been saved!")
+            time.sleep(1)
+            st.rerun()
 
 # ==================== STEP 2: UPLOAD & CLEAN (NO BROWSER) ====================
 elif st.session_state.step == 2:
@@ -984,34 +1084,25 @@ elif st.session_state.step == 2:
     
     if uploaded_file is not None:
         try:
-            # Handle different file types
-            if uploaded_file.name.endswith('.xlsx'):
-                df = pd.read_excel(uploaded_file)
-            else:
-                # Read CSV with encoding fallback for Excel/Windows-formatted files
-                try:
-                    df = pd.read_csv(uploaded_file)
-                except UnicodeDecodeError:
-                    uploaded_file.seek(0)
-                    df = pd.read_csv(uploaded_file, encoding='latin1')
+            # Large CSVs are streamed chunk by chunk at cleaning time
+            streaming = should_stream(uploaded_file)
             
-            st.success(f"✅ File uploaded successfully! Found **{len(df)} rows** and **{len(df.columns)} columns**.")
+            # Phase 1: header + sample only - the full data is read once the columns are chosen
+            df = read_sample(uploaded_file)
             
-            # Column Prediction Logic
-            phone_keywords = ['phone', 'mobile', 'number', 'whatsapp', 'contact']
-            name_keywords = ['business', 'name', 'company', 'lead', 'client']
+            if len(df) < PREVIEW_ROWS:
+                st.success(f"✅ File uploaded successfully! Found **{len(df)} rows** and **{len(df.columns)} columns**.")
+            elif streaming:
+                st.success(f"✅ Large file uploaded ({uploaded_file.size / (1024 * 1024):.0f} MB, **{len(df.columns)} columns**). "
+                           f"Streaming mode: previewing the first **{len(df)} rows**, the full file is cleaned in chunks.")
+            else:
+                st.success(f"✅ File uploaded successfully! Found **{len(df.columns)} columns** (previewing the first **{len(df)} rows**).")
             
-            # Predict Phone
-            pred_phone = next((c for c in df.columns if any(k == c.lower() for k in phone_keywords)), None)
+            # Column Prediction Logic (scored on a sample, cached per file content)
+            pred_phone, pred_name, column_scores = detect_columns(df, file_hash=upload_hash(uploaded_file))
             if not pred_phone:
-                pred_phone = next((c for c in df.columns if any(k in c.lower() for k in phone_keywords)), df.columns[0])
-            
-            # Predict Name (Exclude Unnamed)
-            valid_name_cols = [c for c in df.columns if 'unnamed' not in c.lower()]
-            pred_name = next((c for c in valid_name_cols if c.lower() in ['business name', 'name', 'business', 'company name']), None)
-            if not pred_name and valid_name_cols:
-                pred_name = next((c for c in valid_name_cols if any(k in c.lower() for k in name_keywords)), valid_name_cols[0])
-            elif not pred_name:
+                pred_phone = df.columns[0]
+            if not pred_name:
                 pred_name = df.columns[0]
 
             st.markdown("""
@@ -1026,6 +1117,11 @@ elif st.session_state.step == 2:
                 final_phone_col = st.selectbox("📞 Select Phone Number Column", df.columns, index=list(df.columns).index(pred_phone) if pred_phone in df.columns else 0)
             with col_sel2:
                 final_name_col = st.selectbox("👤 Select Business Name Column", df.columns, index=list(df.columns).index(pred_name) if pred_name in df.columns else 0)
+            
+            # Ranked candidates with confidence, so a wrong guess is easy to spot
+            phone_ranking = ", ".join(f"{col} ({score:.0%})" for col, score in column_scores['phone'][:3])
+            name_ranking = ", ".join(f"{col} ({score:.0%})" for col, score in column_scores['name'][:3])
+            st.caption(f"📞 Phone candidates: {phone_ranking} | 👤 Name candidates: {name_ranking}")
 
             # Show raw data preview
             with st.expander("📄 View Uploaded Data Preview"):
@@ -1039,7 +1135,31 @@ elif st.session_state.step == 2:
                 import re
                 if not re.match(r'^\+\d{1,3}$', default_code):
                     st.warning("⚠️ Country code should be '+' followed by 1-3 digits (e.g. +91, +1, +44)")
-            
+
+            # Parallel validation (only kicks in for large files)
+            with st.expander("⚙️ Advanced Options"):
+                cpu_count = os.cpu_count() or 1
+                validation_workers = st.number_input(
+                    "🧠 Validation Workers (CPU cores)",
+                    min_value=1, max_value=cpu_count, value=cpu_count,
+                    help=f"Phone validation is split across this many processes for files with more than {PARALLEL_VALIDATION_THRESHOLD:,} unique numbers"
+                )
+                skip_contacted = st.checkbox(
+                    "📵 Skip numbers contacted in previous campaigns", value=True,
+                    help=f"{CONTACT_HISTORY.count():,} numbers have been messaged so far"
+                )
+                
+                # Do-not-contact list - always applied when cleaning
+                st.markdown(f"**🚫 Suppression List** ({SUPPRESSION_LIST.count():,} opted-out numbers)")
+                opt_out_file = st.file_uploader("Import opt-out numbers (CSV)", type=['csv'], key="opt_out_upload",
+                                                help="Numbers are normalized with the default country code and never messaged")
+                if opt_out_file is not None and st.button("🚫 Add to Suppression List"):
+                    success, message = SUPPRESSION_LIST.import_csv(opt_out_file, default_code)
+                    if success:
+                        st.success(message)
+                    else:
+                        st.error(message)
+
             # Clean data button
             with col_btn:
                 st.write("") # Spacer
@@ -1047,13 +1167,19 @@ elif st.session_state.step == 2:
                 clean_clicked = st.button("🧹 Clean & Validate Data", type="primary", width="stretch")
             if clean_clicked:
                 with st.spinner("🔄 Cleaning and validating phone numbers..."):
-                    # Call clean_data as a static method with user-selected columns
-                    cleaned_df, report = WhatsAppBot.clean_data(
-                        df, 
+                    clean_options = dict(
                         default_country_code=default_code,
                         phone_col=final_phone_col,
-                        name_col=final_name_col
+                        name_col=final_name_col,
+                        workers=int(validation_workers),
+                        contact_history=CONTACT_HISTORY if skip_contacted else None,
+                        suppression_list=SUPPRESSION_LIST
                     )
+                    # Streams large CSVs, loads only the chosen columns otherwise,
+                    # and reuses the last result for an unchanged file + options
+                    cleaned_df, report = clean_upload(uploaded_file, [final_phone_col, final_name_col], sample=df, **clean_options)
+                    # Keep normalized numbers for the next upload / app restart
+                    PHONE_CACHE.save()
                     
                     if cleaned_df is not None and not cleaned_df.empty:
                         st.session_state.cleaned_data = cleaned_df
@@ -1075,17 +1201,35 @@ elif st.session_state.step == 2:
                         
                         # Additional info
                         st.info(f"📞 Phone Column: **{report['phone_column']}** | 👤 Name Column: **{report['name_column']}**")
-                        
+                        if report['duplicate_rows'] or report['suppressed_rows'] or report['already_contacted_rows']:
+                            st.caption(f"♻️ {report['duplicate_rows']:,} duplicate numbers merged | 🚫 {report['suppressed_rows']:,} opted-out numbers suppressed | "
+                                       f"📵 {report['already_contacted_rows']:,} already contacted numbers skipped")
+                        if report.get('read_seconds') is not None:
+                            st.caption(f"📂 File read in {report['read_seconds']:.2f}s using the {report['reader']} reader")
+                        cache_stats = PHONE_CACHE.stats()
+                        st.caption(f"⚡ Phone cache: {cache_stats['hits']:,} hits / {cache_stats['misses']:,} misses ({cache_stats['hit_rate']:.0%} hit rate, {cache_stats['size']:,} numbers cached)")
+
+                        # Where the time went and why rows were dropped
+                        with st.expander("⏱️ Pipeline Breakdown"):
+                            col_time, col_reject = st.columns(2)
+                            with col_time:
+                                st.markdown("**Time per stage (seconds)**")
+                                stage_seconds = dict(report['stage_seconds'])
+                                if report.get('read_seconds') is not None:
+                                    stage_seconds = {'read': round(report['read_seconds'], 4), **stage_seconds}
+                                st.dataframe(pd.DataFrame({'Seconds': stage_seconds}), width="stretch")
+                            with col_reject:
+                                st.markdown("**Rows removed by reason**")
+                                st.bar_chart(pd.DataFrame({'Rows': report['rejections']}), horizontal=True)
+
                         # Show cleaned data
                         st.markdown("### 📋 Cleaned Data Preview")
                         st.dataframe(cleaned_df.head(20), width="stretch")
                         
                         # Download cleaned data
-                        csv_buffer = io.StringIO()
-                        cleaned_df.to_csv(csv_buffer, index=False)
                         st.download_button(
                             label="📥 Download Cleaned Data (CSV)",
-                            data=csv_buffer.getvalue(),
+                            data=cleaned_df.to_csv(index=False),
                             file_name="cleaned_leads.csv",
                             mime="text/csv"
                         )
@@ -1127,6 +1271,17 @@ elif st.session_state.step == 3:
         df = st.session_state.cleaned_data
         total_leads = len(df)
         
+        # Progress of earlier runs of this exact lead list survives reruns and restarts
+        active_campaign = campaign_id(df)
+        journal_progress = CAMPAIGN_JOURNAL.progress(active_campaign)
+        
+        # A campaign keeps running in the background worker across reloads - reattach to it
+        if st.session_state.campaign_job is None and st.session_state.campaign_results is None:
+            running_job = CAMPAIGN_JOBS.active_job(active_campaign)
+            if running_job is not None:
+                st.session_state.campaign_job = running_job
+                st.session_state.campaign_running = True
+        
         # Campaign summary
         estimated_min = total_leads * 1.5
         estimated_max = total_leads * 2
@@ -1145,7 +1300,7 @@ elif st.session_state.step == 3:
             1. <strong>Do NOT interact</strong> with the browser while it's running.<br>
             2. The tool uses a <strong>'Human-Like'</strong> typing delay (not instant paste).<br>
             3. Messages are <strong>randomized</strong> with 4 high-converting templates.<br>
-            4. If the process stops, just click 'Start Campaign' again to resume.
+            4. Every send is saved immediately - if the process stops, just click 'Start Campaign' again to resume.
         </div>
         """, unsafe_allow_html=True)
         st.subheader("Step 3: Launch Campaign 🚀")
@@ -1171,19 +1326,33 @@ elif st.session_state.step == 3:
             st.markdown("""
             <div class="warning-box">
                 <strong>⚠️ Important Safety Notes:</strong><br><br>
-                • The tool will <strong>launch a FRESH browser</strong> using your saved login<br>
+                • The tool will <strong>reuse the background browser</strong> (started if needed) with your saved login<br>
                 • <strong>DO NOT</strong> close the browser during the campaign<br>
                 • <strong>DO NOT</strong> use WhatsApp Web manually during the campaign<br>
                 • The process will take time - <strong>be patient</strong><br>
-                • The browser will close automatically when done
+                • The browser stays open afterwards, ready for the next campaign
             </div>
             """, unsafe_allow_html=True)
             
+            if st.session_state.campaign_error:
+                st.markdown(f'<div class="error-box"><strong>{st.session_state.campaign_error}</strong></div>', unsafe_allow_html=True)
+            
+            # An interrupted run of the same leads can pick up where it stopped
+            # (a finished one starts over, as before)
+            resume_campaign = not journal_progress['finished']
+            if journal_progress['recorded'] and not journal_progress['finished']:
+                st.info(f"📒 A previous run of this campaign stopped after **{journal_progress['recorded']}/{total_leads}** leads "
+                        f"({journal_progress['sent']} sent, {journal_progress['failed']} failed).")
+                resume_campaign = st.checkbox("⏯️ Resume (skip leads already processed)", value=True)
+            
             col1, col2 = st.columns(2)
             
             with col1:
                 if st.button("🚀 Start Campaign", type="primary", width="stretch"):
+                    # The background worker owns the browser from here on
+                    st.session_state.campaign_job = submit_campaign(df, active_campaign, resume=resume_campaign)
                     st.session_state.campaign_running = True
+                    st.session_state.campaign_error = None
                     st.rerun()
             
             with col2:
@@ -1191,134 +1360,24 @@ elif st.session_state.step == 3:
                     st.session_state.step = 2
                     st.rerun()
         
-        # Campaign execution
+        # Campaign execution happens in the background worker - this page only polls it
         if st.session_state.campaign_running and st.session_state.campaign_results is None:
-            # Initialize results
-            results = []
-            
-            # Progress containers
-            progress_bar = st.progress(0)
-            status_container = st.container()
-            
-            # Metrics using st.empty() to avoid stacking on each iteration
-            metrics_cols = st.columns(3)
-            metric_sent = metrics_cols[0].empty()
-            metric_failed = metrics_cols[1].empty()
-            metric_progress = metrics_cols[2].empty()
-            
-            # Live console
-            st.markdown("### 🖥️ Live Console")
-            console_container = st.empty()
-            console_logs = []
-            
-            # CRITICAL: Launch FRESH browser with cleanup
-            with status_container:
-                st.info("🔄 Launching fresh browser with saved login...")
-            
-            bot = WhatsAppBot()
-            
-            # Force cleanup before launching
-            cleanup_success, cleanup_msg = bot.force_browser_cleanup()
-            if not cleanup_success:
-                st.error(f"❌ {cleanup_msg}")
-                st.session_state.campaign_running = False
-                st.stop()
-            
-            # Launch fresh browser
-            success, message, page = bot.launch_browser()
-            
-            if not success:
-                st.error(f"❌ {message}")
-                st.session_state.campaign_running = False
-                st.stop()
+            campaign_monitor(st.session_state.campaign_job, active_campaign, total_leads)
             
-            with status_container:
-                st.success("✅ Browser launched! Waiting for WhatsApp to load...")
-            
-            # Wait for WhatsApp to load
-            time.sleep(5)
-            
-            # Counters
-            sent_count = 0
-            failed_count = 0
-            
-            # Campaign loop
-            for seq_idx, (idx, row) in enumerate(df.iterrows()):
-                name = row['Name']
-                phone = row['Phone']
-                
-                # Update progress
-                progress = (seq_idx + 1) / total_leads
-                progress_bar.progress(progress)
-                
-                with status_container:
-                    st.info(f"📤 **Sending to:** {name} ({phone}) - **{seq_idx + 1}/{total_leads}**")
-                
-                # Generate personalized message
-                message = bot.generate_message(name)
-                
-                # Send message
-                status, timestamp = bot.send_message(phone, message)
-                
-                # Update counters
-                if "Sent" in status or "✅" in status:
-                    sent_count += 1
-                    log_class = "console-success"
-                    log_msg = f"[{timestamp}] ✅ SUCCESS: {name} ({phone})"
+            # Partial results, straight from the report file the worker appends to - read
+            # only when asked for, never on the monitor's refresh ticks
+            report_file = results_path(active_campaign, "csv")
+            if st.button("📥 Prepare Results So Far", width="stretch"):
+                if os.path.exists(report_file):
+                    with open(report_file, "rb") as f:
+                        st.download_button(
+                            label="📥 Download Results So Far",
+                            data=f.read(),
+                            file_name=f"campaign_partial_{time.strftime('%Y%m%d_%H%M%S')}.csv",
+                            mime="text/csv"
+                        )
                 else:
-                    failed_count += 1
-                    log_class = "console-error"
-                    log_msg = f"[{timestamp}] ❌ FAILED: {name} ({phone}) - {status}"
-                
-                # Add to console logs
-                console_logs.append(f'<span class="{log_class}">{log_msg}</span>')
-                
-                # Update console (show last 10 logs)
-                console_html = '<div class="live-console">' + '<br>'.join(console_logs[-10:]) + '</div>'
-                console_container.markdown(console_html, unsafe_allow_html=True)
-                
-                # Log result
-                results.append({
-                    'Name': name,
-                    'Phone': phone,
-                    'Status': status,
-                    'Timestamp': timestamp
-                })
-                
-                # Update metrics (using st.empty placeholders to avoid stacking)
-                metric_sent.metric("✅ Sent", sent_count)
-                metric_failed.metric("❌ Failed", failed_count)
-                metric_progress.metric("📊 Progress", f"{seq_idx + 1}/{total_leads}")
-                
-                # Anti-ban delay (except for last message)
-                if seq_idx < total_leads - 1:
-                    with status_container:
-                        countdown_placeholder = st.empty()
-                        
-                        # Capture placeholder in default arg to avoid stale closure
-                        def update_countdown(remaining, _ph=countdown_placeholder):
-                            mins = remaining // 60
-                            secs = remaining % 60
-                            _ph.warning(f"⏳ **Cooling down...** {mins}m {secs}s remaining (Anti-Ban Protection)")
-                        
-                        bot.wait_with_countdown(60, 120, update_countdown)
-                        countdown_placeholder.empty()
-            
-            # CRITICAL: Close browser to release lock
-            with status_container:
-                st.info("🔒 Closing browser to release lock...")
-            
-            bot.close_browser()
-            
-            # Campaign complete
-            st.session_state.campaign_results = pd.DataFrame(results)
-            st.session_state.campaign_running = False
-            progress_bar.progress(1.0)
-            
-            with status_container:
-                st.success("🎉 **Campaign Complete! Browser closed.**")
-            
-            st.rerun()
+                    st.info("No leads processed yet")
         
         # Show results if campaign is complete
         if st.session_state.campaign_results is not None:
@@ -1349,14 +1408,28 @@ elif st.session_state.step == 3:
             col1, col2 = st.columns(2)
             
             with col1:
-                csv_buffer = io.StringIO()
-                results_df.to_csv(csv_buffer, index=False)
+                # Served straight from the report file the worker wrote row by row - nothing is rebuilt
+                report_file = results_path(active_campaign, "csv")
+                if os.path.exists(report_file):
+                    with open(report_file, "rb") as f:
+                        report_data = f.read()
+                else:
+                    report_data = results_df.to_csv(index=False)
                 st.download_button(
                     label="📥 Download Campaign Report (CSV)",
-                    data=csv_buffer.getvalue(),
+                    data=report_data,
                     file_name=f"campaign_report_{time.strftime('%Y%m%d_%H%M%S')}.csv",
                     mime="text/csv"
                 )
+                parquet_file = results_path(active_campaign, "parquet")
+                if os.path.exists(parquet_file):
+                    with open(parquet_file, "rb") as f:
+                        st.download_button(
+                            label="📥 Download Campaign Report (Parquet)",
+                            data=f.read(),
+                            file_name=f"campaign_report_{time.strftime('%Y%m%d_%H%M%S')}.parquet",
+                            mime="application/octet-stream"
+                        )
             
             with col2:
                 if st.button("🔄 Start New Campaign", type="primary", width="stretch"):
@@ -1365,6 +1438,8 @@ elif st.session_state.step == 3:
                     st.session_state.data_report = None
                     st.session_state.campaign_results = None
                     st.session_state.campaign_running = False
+                    st.session_state.campaign_job = None
+                    st.session_state.campaign_error = None
                     st.rerun()
 
 # ==================== FOOTER ====================
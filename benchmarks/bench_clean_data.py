@@ -0,0 +1,200 @@
+"""
+FireHox Benchmarks - clean_data and the Step 2 Read Path
+Times and memory-profiles lead cleaning on seeded synthetic data and writes JSON results
+
+Usage (from the repository root):
+    python benchmarks/bench_clean_data.py                      # 1k + 100k
+    python benchmarks/bench_clean_data.py --sizes 1k 100k 1M
+    python benchmarks/bench_clean_data.py --compare benchmarks/results/<older>.json
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from whatsapp_engine import WhatsAppBot, PhoneCache
+from lead_loader import read_sample, clean_upload, UPLOAD_CACHE
+from synthetic_leads import SIZES, generate_leads
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# A benchmark is flagged when it is this much slower (or hungrier) than the baseline
+REGRESSION_TOLERANCE = 1.2
+
+
+class BenchmarkUpload(io.BytesIO):
+    """In-memory stand-in for Streamlit's UploadedFile (name, size, file_id, getbuffer)"""
+
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+        self.file_id = None
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _measure(func, repeat):
+    """
+    Best-of-`repeat` wall time, then one extra run under tracemalloc for peak memory
+    (tracemalloc slows allocation-heavy code, so it never overlaps the timed runs)
+    Returns: (seconds, peak_mb, last_result)
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(timings), peak / (1024 * 1024), result
+
+
+def _clean_cold(leads):
+    """clean_data with no phone cache - every number is normalized and validated"""
+    return lambda: WhatsAppBot.clean_data(leads, phone_cache=None)
+
+
+def _clean_warm(leads):
+    """clean_data with a primed in-memory phone cache (a re-upload of the same list)"""
+    cache = PhoneCache(path=None)
+    WhatsAppBot.clean_data(leads, phone_cache=cache)
+    return lambda: WhatsAppBot.clean_data(leads, phone_cache=cache)
+
+
+def _read_and_clean(csv_bytes):
+    """Step 2 end to end: sample read, column re-read (or streaming) and cleaning, caches cold"""
+    def run():
+        UPLOAD_CACHE.clear()
+        upload = BenchmarkUpload(csv_bytes, "leads.csv")
+        sample = read_sample(upload)
+        return clean_upload(upload, ['Phone', 'Business Name'], sample=sample, phone_cache=None)
+    return run
+
+
+BENCHMARKS = {
+    'clean_data_cold': _clean_cold,
+    'clean_data_warm_cache': _clean_warm,
+}
+
+
+def run_benchmarks(sizes, repeat=3, seed=0):
+    """
+    Run every benchmark at every size
+    Returns: list of result dicts (benchmark, size, rows, seconds, rows_per_second, peak_mb, valid_rows,
+    stage_seconds of the last run)
+    """
+    results = []
+    for size in sizes:
+        rows = SIZES[size]
+        leads = generate_leads(rows, seed=seed)
+        csv_bytes = leads.to_csv(index=False).encode("utf-8")
+        print(f"📊 {size}: {rows:,} rows, {len(csv_bytes) / (1024 * 1024):.1f} MB as CSV")
+
+        cases = [(name, factory(leads)) for name, factory in BENCHMARKS.items()]
+        cases.append(('step2_read_and_clean', _read_and_clean(csv_bytes)))
+
+        for name, func in cases:
+            # The biggest size is slow enough that one timed run is representative
+            seconds, peak_mb, (valid_df, report) = _measure(func, repeat if rows < 1000000 else 1)
+            results.append({
+                'benchmark': name,
+                'size': size,
+                'rows': rows,
+                'seconds': round(seconds, 4),
+                'rows_per_second': round(rows / seconds),
+                'peak_mb': round(peak_mb, 1),
+                'valid_rows': len(valid_df) if valid_df is not None else 0,
+                'stage_seconds': report.get('stage_seconds'),
+            })
+            print(f"   ⏱️ {name:<24} {seconds:8.3f}s  {peak_mb:8.1f} MB peak  {results[-1]['valid_rows']:,} valid")
+        UPLOAD_CACHE.clear()
+    return results
+
+
+def compare(results, baseline_path, tolerance=REGRESSION_TOLERANCE):
+    """
+    Print current vs baseline for matching (benchmark, size) pairs
+    Returns: list of regressions as (benchmark, size, metric, ratio)
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    previous = {(entry['benchmark'], entry['size']): entry for entry in baseline['results']}
+
+    print(f"\n🔍 Compared with {baseline.get('commit', '?')} ({baseline_path})")
+    regressions = []
+    for entry in results:
+        old = previous.get((entry['benchmark'], entry['size']))
+        if old is None:
+            continue
+        for metric in ('seconds', 'peak_mb'):
+            ratio = entry[metric] / old[metric] if old[metric] else 1.0
+            marker = "❌" if ratio > tolerance else "✅"
+            if ratio > tolerance:
+                regressions.append((entry['benchmark'], entry['size'], metric, round(ratio, 2)))
+            print(f"   {marker} {entry['benchmark']:<24} {entry['size']:>5} {metric:<8} {old[metric]:>10} -> {entry[metric]:<10} ({ratio:.2f}x)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FireHox lead cleaning")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=['1k', '100k'])
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark (best one is kept)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON file to write (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    commit = _git_commit()
+    results = run_benchmarks(args.sizes, repeat=args.repeat, seed=args.seed)
+    payload = {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec="seconds"),
+        'seed': args.seed,
+        'environment': {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'results': results,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    print(f"💾 Results written to {output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) slower or bigger than {REGRESSION_TOLERANCE}x baseline")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
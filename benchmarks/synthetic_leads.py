@@ -0,0 +1,135 @@
+"""
+FireHox Benchmarks - Synthetic Lead Generator
+Seeded, realistic messy lead exports (Google Maps scrapes, Excel round-trips, hand-typed lists)
+"""
+
+import numpy as np
+import pandas as pd
+
+# Row counts used by the benchmark suite
+SIZES = {'1k': 1000, '100k': 100000, '1M': 1000000}
+
+# Share of rows that repeat an earlier lead (same number, possibly formatted differently)
+DUPLICATE_RATE = 0.1
+
+# (weight, format) - {m} is a 10-digit Indian mobile, {d} random digits
+PHONE_FORMATS = [
+    (20, "{m}"),
+    (12, "+91{m}"),
+    (8, "91{m}"),
+    (6, "0{m}"),
+    (10, "+91 {m5} {m_5}"),
+    (5, "(+91) {m5}-{m_5}"),
+    (4, "{m}.0"),               # Excel float round-trip
+    (3, "0091{m}"),
+    (6, "+1 (415) 555-{d4}"),
+    (4, "+44 20 7946 {d4}"),
+    (3, "+971 50 {d3} {d4}"),
+    (2, "+61 4{d4} {d4}"),
+    (3, "{d7}"),                # local number without area code
+    (2, "123"),
+    (3, ""),
+    (3, "N/A"),
+    (2, "call shop"),
+    (2, "+"),
+    (2, "{m} / {m}"),            # two numbers in one cell
+]
+
+NAME_WORDS = ['Sharma', 'Cafe', 'Bakery', 'Dental', 'Clinic', 'Motors', 'Salon', 'Tiffin', 'Sweets',
+              'Electricals', 'Hardware', 'Gym', 'Boutique', 'Opticals', 'Pharmacy', 'Traders']
+JUNK_NAMES = ['', 'nan', 'NaN', 'N/A', 'Google Maps.csv', '.CSV', '   ', '9876543210']
+
+
+def _digits(rng, rows, count):
+    """`rows` random digit strings of length `count`"""
+    values = rng.integers(0, 10 ** count, size=rows)
+    return pd.Series(values).astype(str).str.zfill(count)
+
+
+def _phones(rng, rows):
+    """Messy phone column: mixed formats, country codes and junk"""
+    mobiles = rng.integers(6, 10, size=rows).astype(str) + _digits(rng, rows, 9)
+    parts = {
+        'm': mobiles,
+        'm5': mobiles.str[:5],
+        'm_5': mobiles.str[5:],
+        'd3': _digits(rng, rows, 3),
+        'd4': _digits(rng, rows, 4),
+        'd7': _digits(rng, rows, 7),
+    }
+    weights = np.array([weight for weight, _ in PHONE_FORMATS], dtype=float)
+    chosen = rng.choice(len(PHONE_FORMATS), size=rows, p=weights / weights.sum())
+
+    phones = pd.Series('', index=range(rows), dtype=object)
+    for index, (_, template) in enumerate(PHONE_FORMATS):
+        rows_with_format = np.flatnonzero(chosen == index)
+        if len(rows_with_format) == 0:
+            continue
+        # Build the values piece by piece, filling each placeholder from its column
+        values = pd.Series('', index=rows_with_format, dtype=object)
+        for piece in _split_template(template):
+            if piece.startswith('{'):
+                values = values + parts[piece[1:-1]].iloc[rows_with_format].to_numpy()
+            else:
+                values = values + piece
+        phones.iloc[rows_with_format] = values.to_numpy()
+
+    # Some cells are truly empty, not just blank strings
+    phones[rng.random(rows) < 0.02] = np.nan
+    return phones
+
+
+def _split_template(template):
+    """'+91 {m5} {m_5}' -> ['+91 ', '{m5}', ' ', '{m_5}']"""
+    pieces = []
+    while template:
+        start = template.find('{')
+        if start == -1:
+            pieces.append(template)
+            break
+        if start:
+            pieces.append(template[:start])
+        end = template.index('}', start)
+        pieces.append(template[start:end + 1])
+        template = template[end + 1:]
+    return pieces
+
+
+def _names(rng, rows):
+    """Business names with junk values mixed in"""
+    first = np.array(NAME_WORDS)[rng.integers(0, len(NAME_WORDS), size=rows)]
+    second = np.array(NAME_WORDS)[rng.integers(0, len(NAME_WORDS), size=rows)]
+    names = pd.Series(first, dtype=object) + ' ' + pd.Series(second, dtype=object) + ' ' + pd.Series(range(rows)).astype(str)
+    junk = rng.random(rows) < 0.08
+    names[junk] = np.array(JUNK_NAMES, dtype=object)[rng.integers(0, len(JUNK_NAMES), size=int(junk.sum()))]
+    names[rng.random(rows) < 0.02] = np.nan
+    return names
+
+
+def generate_leads(rows, seed=0, duplicate_rate=DUPLICATE_RATE):
+    """
+    Build a messy lead table the way real exports look
+
+    Columns: 'Business Name', 'Phone', 'Address', 'Rating', 'Unnamed: 4' (index
+    column left behind by an Excel round-trip). About `duplicate_rate` of the
+    rows repeat an earlier lead's number. The same (rows, seed) always gives the same frame.
+    Returns: DataFrame
+    """
+    rng = np.random.default_rng(seed)
+    phones = _phones(rng, rows)
+    names = _names(rng, rows)
+
+    # Duplicates copy an earlier row's phone and name
+    duplicate_rows = np.flatnonzero(rng.random(rows) < duplicate_rate)
+    duplicate_rows = duplicate_rows[duplicate_rows > 0]
+    sources = (rng.random(len(duplicate_rows)) * duplicate_rows).astype(np.int64)
+    phones.iloc[duplicate_rows] = phones.iloc[sources].to_numpy()
+    names.iloc[duplicate_rows] = names.iloc[sources].to_numpy()
+
+    return pd.DataFrame({
+        'Business Name': names,
+        'Phone': phones,
+        'Address': 'Shop ' + pd.Series(rng.integers(1, 500, size=rows)).astype(str) + ', MG Road',
+        'Rating': np.round(rng.uniform(1, 5, size=rows), 1),
+        'Unnamed: 4': np.where(rng.random(rows) < 0.5, None, 'x'),
+    })
@@ -0,0 +1,237 @@
+"""
+FireHox Browser Host - Warm WhatsApp Web Browser
+One long-lived process owns the persistent browser profile (and its SingletonLock)
+and keeps WhatsApp Web loaded; Step 1 and campaigns attach to it over CDP instead
+of launching and closing their own browser
+
+Run standalone with:  python browser_host.py
+(the app starts it automatically)
+"""
+
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from whatsapp_engine import (
+    WhatsAppBot, pid_alive, sync_playwright, PlaywrightTimeout, PlaywrightError
+)
+from request_filter import RequestFilter, REQUEST_FILTER_ENABLED, REQUEST_FILTER_STATS_FILE
+from local_store import atomic_write_json
+
+# Lock file naming the host that owns the browser profile: pid, CDP port, state
+BROWSER_HOST_LOCK_FILE = "./firehox_browser_host.json"
+
+# Longest wait for a new host to have WhatsApp Web loaded / for a host to shut down
+BROWSER_HOST_START_TIMEOUT = 90
+BROWSER_HOST_STOP_TIMEOUT = 20
+BROWSER_HOST_POLL_SECONDS = 0.5
+
+
+def read_host_lock(path=BROWSER_HOST_LOCK_FILE):
+    """Returns: the lock file's dict, or None if there is none (or it is half-written)"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_host_lock(info, path=BROWSER_HOST_LOCK_FILE):
+    atomic_write_json(path, info)
+
+
+def host_info(path=BROWSER_HOST_LOCK_FILE):
+    """
+    The running host, if any - a lock left behind by a dead host is removed
+    Returns: dict with pid, port, endpoint and state ('starting', 'ready', 'stopping'), or None
+    """
+    info = read_host_lock(path)
+    if info is None:
+        return None
+    if not pid_alive(info.get('pid')):
+        try:
+            os.remove(path)
+            print(f"🧹 Removed stale browser host lock (pid {info.get('pid')})")
+        except OSError:
+            pass
+        return None
+    return info
+
+
+def ensure_browser_host(path=BROWSER_HOST_LOCK_FILE, timeout=BROWSER_HOST_START_TIMEOUT):
+    """
+    Start the browser host unless one is running, and wait until WhatsApp Web is loaded
+    Returns: (success: bool, message: str, endpoint: CDP URL or None)
+    """
+    info = host_info(path)
+    if info is not None and info.get('state') == 'stopping':
+        # Let the old host release the profile before a new one claims it
+        stop_browser_host(path)
+        info = None
+    if info is None:
+        script = os.path.abspath(__file__)
+        options = {}
+        if sys.platform == 'win32':
+            options['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS
+        else:
+            options['start_new_session'] = True
+        # Same working directory as the caller - the profile and lock paths are relative to it
+        process = subprocess.Popen([sys.executable, script], cwd=os.getcwd(),
+                                   stdin=subprocess.DEVNULL, **options)
+        print(f"🚀 Starting browser host (pid {process.pid})...")
+    else:
+        process = None
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        info = read_host_lock(path)
+        if info and info.get('state') == 'ready':
+            return True, "✅ Browser host ready", info['endpoint']
+        if info and info.get('state') == 'failed':
+            return False, info.get('message', "❌ Browser host failed to start"), None
+        if (info and not pid_alive(info.get('pid'))) or (process is not None and process.poll() is not None and info is None):
+            return False, "❌ Browser host exited during startup", None
+        time.sleep(BROWSER_HOST_POLL_SECONDS)
+    return False, "⏱️ Browser host did not become ready in time", None
+
+
+def stop_browser_host(path=BROWSER_HOST_LOCK_FILE, timeout=BROWSER_HOST_STOP_TIMEOUT):
+    """
+    Ask the running host to close its browser (releasing the profile lock) and wait for it
+    Returns: (success: bool, message: str)
+    """
+    info = host_info(path)
+    if info is None:
+        return True, "No browser host running"
+
+    if info.get('state') != 'stopping':
+        _write_host_lock(dict(info, state='stopping'), path)
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not pid_alive(info['pid']) or read_host_lock(path) is None:
+            return True, "✅ Browser host stopped"
+        time.sleep(BROWSER_HOST_POLL_SECONDS)
+
+    # Still alive: the host is stuck, so end it the hard way
+    try:
+        os.kill(info['pid'], signal.SIGTERM)
+    except OSError:
+        pass
+    return False, f"⚠️ Browser host (pid {info['pid']}) did not stop in time and was terminated"
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _claim_host_lock(path=BROWSER_HOST_LOCK_FILE):
+    """
+    Create the lock file exclusively, so at most one host ever owns the browser profile
+    Returns: True if this process is now the host
+    """
+    for _ in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            if host_info(path) is not None:
+                return False
+            continue  # Stale lock was just removed - try again
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({'pid': os.getpid(), 'port': None, 'endpoint': None, 'state': 'starting'}, f)
+        return True
+    return False
+
+
+def _stop_requested(path):
+    info = read_host_lock(path)
+    return info is None or info.get('pid') != os.getpid() or info.get('state') == 'stopping'
+
+
+def run_host(path=BROWSER_HOST_LOCK_FILE, request_filter=REQUEST_FILTER_ENABLED):
+    """
+    Host main loop: own the browser until a stop is requested or the browser window is closed
+    request_filter: route the context through RequestFilter (stats in REQUEST_FILTER_STATS_FILE)
+    """
+    pid = os.getpid()
+    if not _claim_host_lock(path):
+        print("⚠️ Another browser host is already running - exiting")
+        return
+
+    stopped = threading.Event()
+    if sys.platform != 'win32':
+        signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+
+    playwright = None
+    context = None
+    filter_ = RequestFilter(stats_path=REQUEST_FILTER_STATS_FILE) if request_filter else None
+    if filter_ is None and os.path.exists(REQUEST_FILTER_STATS_FILE):
+        os.remove(REQUEST_FILTER_STATS_FILE)  # No stale numbers from an earlier session
+    try:
+        cleanup_success, cleanup_msg = WhatsAppBot.force_browser_cleanup()
+        if not cleanup_success:
+            _write_host_lock({'pid': pid, 'state': 'failed', 'message': cleanup_msg}, path)
+            return
+
+        port = _free_port()
+        playwright = sync_playwright().start()
+        context = playwright.chromium.launch_persistent_context(
+            **WhatsAppBot.context_options([f'--remote-debugging-port={port}'])
+        )
+        if filter_:
+            # The host always waits on Playwright, so routed requests are answered right away
+            filter_.install(context)
+            filter_.flush(force=True)
+        page = context.pages[0] if context.pages else context.new_page()
+        page.goto("https://web.whatsapp.com", timeout=60000, wait_until="domcontentloaded")
+
+        _write_host_lock({'pid': pid, 'port': port, 'endpoint': f"http://127.0.0.1:{port}",
+                          'state': 'ready', 'started_at': time.strftime("%Y-%m-%d %H:%M:%S")}, path)
+        print(f"✅ Browser host {pid} ready on port {port}")
+
+        while not stopped.is_set() and not _stop_requested(path):
+            try:
+                # Waiting on Playwright (not time.sleep) keeps its event loop turning,
+                # and returns early if the user closes the browser window
+                context.wait_for_event("close", timeout=BROWSER_HOST_POLL_SECONDS * 1000)
+                print("🔒 Browser was closed - host exiting")
+                context = None
+                break
+            except PlaywrightTimeout:
+                if filter_:
+                    filter_.flush()
+
+    except PlaywrightError as e:
+        print(f"❌ Browser host failed: {e}")
+        _write_host_lock({'pid': pid, 'state': 'failed',
+                          'message': f"❌ Browser launch error: {str(e)[:200]}"}, path)
+    finally:
+        if filter_:
+            filter_.flush(force=True)
+            stats = filter_.stats()
+            print(f"🌐 Request filter: {stats['blocked_requests']} requests blocked, "
+                  f"~{stats['estimated_bytes_saved'] / 1e6:.1f} MB saved")
+        try:
+            if context: context.close()
+            if playwright: playwright.stop()
+        except Exception:
+            pass
+        # Release the lock only if it is still ours (a 'failed' lock stays for
+        # ensure_browser_host to report; host_info clears it once we are gone)
+        info = read_host_lock(path)
+        if info is not None and info.get('pid') == pid and info.get('state') != 'failed':
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        print(f"👋 Browser host {pid} stopped")
+
+
+if __name__ == "__main__":
+    run_host()
@@ -0,0 +1,135 @@
+"""
+FireHox Campaign Journal - Crash-Safe Campaign Progress
+Append-only SQLite journal of every send, durable on disk before the next lead starts
+"""
+
+import hashlib
+import threading
+from datetime import datetime
+import pandas as pd
+from local_store import sqlite_connection, enable_wal
+
+CAMPAIGN_JOURNAL_DB = "./firehox_campaigns.db"
+
+
+def campaign_id(leads):
+    """
+    Stable id for a lead list: the same cleaned leads (same names, phones, order)
+    always map to the same campaign, so a re-run finds its earlier progress
+    Returns: 16-character hex string
+    """
+    row_hashes = pd.util.hash_pandas_object(leads[['Name', 'Phone']].astype(str), index=False)
+    return hashlib.sha256(row_hashes.to_numpy().tobytes()).hexdigest()[:16]
+
+
+class CampaignJournal:
+    """
+    One row per processed lead, written (and fsynced) as soon as the send finishes
+    WAL mode keeps each commit to one sequential append; synchronous=FULL makes
+    that append hit the disk before record() returns, so a crash, rerun or
+    restart loses at most the lead that was in flight.
+    """
+
+    def __init__(self, path=CAMPAIGN_JOURNAL_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._schema_lock = threading.Lock()
+        self._ready = False
+
+    def _ensure_schema(self):
+        """Switch to WAL and create the tables on the first journal access, not at import"""
+        with self._schema_lock:
+            if self._ready:
+                return
+            enable_wal(self.path)
+            with sqlite_connection(self.path) as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS campaigns ("
+                    " campaign_id TEXT PRIMARY KEY,"
+                    " total_leads INTEGER,"
+                    " started_at TEXT,"
+                    " finished_at TEXT"
+                    ")"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS sends ("
+                    " campaign_id TEXT,"
+                    " seq INTEGER,"
+                    " name TEXT,"
+                    " phone TEXT,"
+                    " status TEXT,"
+                    " sent_at TEXT,"
+                    " PRIMARY KEY (campaign_id, phone)"
+                    ") WITHOUT ROWID"
+                )
+            self._ready = True
+
+    def _connect(self):
+        """Commits fsync before returning (synchronous=FULL)"""
+        self._ensure_schema()
+        return sqlite_connection(self.path, pragmas=("PRAGMA synchronous=FULL",))
+
+    def start(self, campaign, total_leads, resume=True):
+        """
+        Open a campaign in the journal
+        resume=False forgets the campaign's earlier sends so every lead is processed again
+        Returns: set of phones already recorded (empty when not resuming)
+        """
+        with self._lock, self._connect() as conn:
+            if not resume:
+                conn.execute("DELETE FROM sends WHERE campaign_id = ?", (campaign,))
+            conn.execute(
+                "INSERT INTO campaigns VALUES (?, ?, ?, NULL) "
+                "ON CONFLICT (campaign_id) DO UPDATE SET finished_at = NULL",
+                (campaign, total_leads, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            )
+            return {row[0] for row in conn.execute("SELECT phone FROM sends WHERE campaign_id = ?", (campaign,))}
+
+    def record(self, campaign, seq, name, phone, status, timestamp):
+        """Append one processed lead - durable on disk when this returns"""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO sends VALUES (?, ?, ?, ?, ?, ?)",
+                (campaign, seq, name, phone, status, timestamp)
+            )
+
+    def finish(self, campaign):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE campaigns SET finished_at = ? WHERE campaign_id = ?",
+                (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), campaign)
+            )
+
+    def progress(self, campaign):
+        """
+        Returns: dict with recorded, sent and failed counts and whether the campaign finished
+        """
+        with self._connect() as conn:
+            recorded, sent = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(status LIKE '%Sent%' OR status LIKE '%✅%'), 0) "
+                "FROM sends WHERE campaign_id = ?", (campaign,)
+            ).fetchone()
+            finished = conn.execute(
+                "SELECT finished_at FROM campaigns WHERE campaign_id = ?", (campaign,)
+            ).fetchone()
+        return {
+            'recorded': recorded,
+            'sent': sent,
+            'failed': recorded - sent,
+            'finished': bool(finished and finished[0]),
+        }
+
+    def results(self, campaign):
+        """
+        Returns: DataFrame with Name, Phone, Status, Timestamp in lead order
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT name, phone, status, sent_at FROM sends WHERE campaign_id = ? ORDER BY seq",
+                (campaign,)
+            ).fetchall()
+        return pd.DataFrame(rows, columns=['Name', 'Phone', 'Status', 'Timestamp'])
+
+
+# Shared journal used by the app
+CAMPAIGN_JOURNAL = CampaignJournal()
@@ -0,0 +1,492 @@
+"""
+FireHox Campaign Worker - Background Campaign Execution
+Runs campaigns in a separate process fed by a small SQLite job queue, so the
+Streamlit UI only submits jobs and polls their status
+
+Run standalone with:  python campaign_worker.py
+(the app starts it automatically when a campaign is submitted)
+"""
+
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+import pandas as pd
+from local_store import sqlite_connection, enable_wal
+from whatsapp_engine import WhatsAppBot
+from browser_host import ensure_browser_host
+from memory_watchdog import MemoryWatchdog
+from campaign_journal import CAMPAIGN_JOURNAL
+from contact_history import CONTACT_HISTORY
+from results_export import ResultsWriter
+
+CAMPAIGN_JOBS_DB = "./firehox_jobs.db"
+# Lead lists handed to the worker, one CSV per campaign
+CAMPAIGN_JOBS_DIR = "./firehox_jobs"
+
+# How often the worker refreshes its heartbeat / looks for new jobs
+WORKER_HEARTBEAT_SECONDS = 5
+WORKER_POLL_SECONDS = 2
+# A worker whose heartbeat is older than this is considered dead
+WORKER_STALE_SECONDS = 30
+# An idle worker exits after this long so it never lingers after the app is gone
+WORKER_IDLE_EXIT_SECONDS = 600
+
+# Longest wait for WhatsApp Web to show the chat list after launch
+WHATSAPP_LOAD_TIMEOUT_MS = 30000
+
+# Anti-ban delay between messages (seconds)
+COOLDOWN_RANGE = (60, 120)
+
+# Live telemetry: console events kept per job, and how often status reaches the
+# job store (and the Step 3 view polls it)
+TELEMETRY_BUFFER_SIZE = 10
+TELEMETRY_REFRESH_SECONDS = 2
+
+ACTIVE_JOB_STATES = ('queued', 'running')
+
+
+def is_sent(status):
+    """Same success test the campaign report uses"""
+    return "Sent" in status or "✅" in status
+
+
+class CampaignCancelled(Exception):
+    """Raised inside the send loop when the user stops the campaign"""
+
+
+class JobStore:
+    """
+    Job queue + status store shared by the app (submit / poll / cancel) and the worker
+    The worker writes progress through Telemetry; polling it is a single primary-key read.
+    """
+
+    def __init__(self, path=CAMPAIGN_JOBS_DB):
+        self.path = path
+        self._schema_lock = threading.Lock()
+        self._ready = False
+
+    def _ensure_schema(self):
+        """Set up the job database when it is first used, so importing never creates it"""
+        with self._schema_lock:
+            if self._ready:
+                return
+            # WAL lets the app poll while the worker writes
+            enable_wal(self.path)
+            with sqlite_connection(self.path, row_factory=sqlite3.Row) as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS jobs ("
+                    " job_id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                    " campaign_id TEXT,"
+                    " leads_path TEXT,"
+                    " resume INTEGER,"
+                    " state TEXT,"
+                    " total INTEGER,"
+                    " processed INTEGER DEFAULT 0,"
+                    " sent INTEGER DEFAULT 0,"
+                    " failed INTEGER DEFAULT 0,"
+                    " current_lead TEXT,"
+                    " message TEXT,"
+                    " cancel_requested INTEGER DEFAULT 0,"
+                    " created_at TEXT,"
+                    " updated_at TEXT,"
+                    " events TEXT,"
+                    " cooldown_until REAL"
+                    ")"
+                )
+                # Telemetry columns for job stores created before they existed
+                columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+                for column, column_type in (('events', 'TEXT'), ('cooldown_until', 'REAL')):
+                    if column not in columns:
+                        conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS worker ("
+                    " slot INTEGER PRIMARY KEY CHECK (slot = 1),"
+                    " pid INTEGER,"
+                    " heartbeat REAL"
+                    ")"
+                )
+            self._ready = True
+
+    def _connect(self):
+        """Write lock up front: claim_next and register_worker read, then write"""
+        self._ensure_schema()
+        return sqlite_connection(self.path, immediate=True, row_factory=sqlite3.Row)
+
+    @staticmethod
+    def _now():
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    # ==================== APP SIDE ====================
+
+    def submit(self, campaign, leads_path, total, resume=True):
+        """
+        Queue a campaign (an already active job for the same campaign is reused)
+        Returns: job_id
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT job_id FROM jobs WHERE campaign_id = ? AND state IN ('queued', 'running')", (campaign,)
+            ).fetchone()
+            if row is not None:
+                return row['job_id']
+            cursor = conn.execute(
+                "INSERT INTO jobs (campaign_id, leads_path, resume, state, total, message, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+                (campaign, leads_path, int(resume), total, "⏳ Waiting for the campaign worker...", self._now(), self._now())
+            )
+            return cursor.lastrowid
+
+    def job(self, job_id):
+        """Returns: job row as a dict, or None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def active_job(self, campaign):
+        """Returns: job_id of the queued/running job for `campaign`, or None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT job_id FROM jobs WHERE campaign_id = ? AND state IN ('queued', 'running') "
+                "ORDER BY job_id DESC LIMIT 1", (campaign,)
+            ).fetchone()
+        return row['job_id'] if row is not None else None
+
+    def cancel(self, job_id):
+        """
+        Ask the worker to stop after the current lead
+        A queued job - or a running one whose worker has died - is cancelled right away.
+        """
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE job_id = ?", (self._now(), job_id))
+            states = ('queued',) if self._worker_alive(conn) else ('queued', 'running')
+            conn.execute(
+                "UPDATE jobs SET state = 'cancelled', message = '⏹️ Campaign stopped' "
+                f"WHERE job_id = ? AND state IN ({', '.join('?' * len(states))})", (job_id, *states)
+            )
+
+    @staticmethod
+    def _worker_alive(conn):
+        row = conn.execute("SELECT heartbeat FROM worker WHERE slot = 1").fetchone()
+        return row is not None and time.time() - row['heartbeat'] < WORKER_STALE_SECONDS
+
+    def worker_alive(self):
+        with self._connect() as conn:
+            return self._worker_alive(conn)
+
+    def reserve_worker(self):
+        """
+        Hold the free worker slot (no pid yet) for a process about to be started, so
+        polls during its startup don't start another one - it gets WORKER_STALE_SECONDS
+        to register
+        Returns: False when a live worker (or a reservation) already holds the slot
+        """
+        with self._connect() as conn:
+            if self._worker_alive(conn):
+                return False
+            conn.execute("INSERT OR REPLACE INTO worker VALUES (1, NULL, ?)", (time.time(),))
+        return True
+
+    # ==================== WORKER SIDE ====================
+
+    def register_worker(self, pid):
+        """
+        Claim the single worker slot - there is one browser profile, so only one
+        worker may run. Jobs left 'running' by a dead worker are re-queued (they
+        resume from the journal, so nothing is sent twice).
+        Returns: True when this process is now the worker
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT pid, heartbeat FROM worker WHERE slot = 1").fetchone()
+            if row is not None and row['pid'] not in (None, pid) and time.time() - row['heartbeat'] < WORKER_STALE_SECONDS:
+                return False
+            conn.execute("INSERT OR REPLACE INTO worker VALUES (1, ?, ?)", (pid, time.time()))
+            conn.execute(
+                "UPDATE jobs SET state = 'queued', resume = 1, message = '⏯️ Resuming after worker restart', updated_at = ? "
+                "WHERE state = 'running'", (self._now(),)
+            )
+        return True
+
+    def heartbeat(self, pid):
+        with self._connect() as conn:
+            conn.execute("UPDATE worker SET heartbeat = ? WHERE slot = 1 AND pid = ?", (time.time(), pid))
+
+    def unregister_worker(self, pid):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM worker WHERE slot = 1 AND pid = ?", (pid,))
+
+    def retire_worker(self, pid):
+        """
+        Release the worker slot of an idle worker - unless a job was queued meanwhile.
+        Checked in the same transaction as submit() writes, so a job submitted while
+        ensure_worker still saw this worker alive is never left without one.
+        Returns: True when the worker may exit
+        """
+        with self._connect() as conn:
+            if conn.execute("SELECT 1 FROM jobs WHERE state = 'queued' LIMIT 1").fetchone() is not None:
+                return False
+            conn.execute("DELETE FROM worker WHERE slot = 1 AND pid = ?", (pid,))
+        return True
+
+    def claim_next(self):
+        """
+        Atomically move the oldest queued job to 'running'
+        Returns: job dict, or None when the queue is empty
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE state = 'queued' ORDER BY job_id LIMIT 1").fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET state = 'running', message = '🔄 Launching fresh browser with saved login...', updated_at = ? "
+                "WHERE job_id = ?", (self._now(), row['job_id'])
+            )
+        return dict(row)
+
+    def update(self, job_id, **fields):
+        """Write progress fields (processed, sent, failed, current_lead, message, state, events, cooldown_until)"""
+        fields['updated_at'] = self._now()
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*fields.values(), job_id))
+
+    def cancel_requested(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return bool(row and row['cancel_requested'])
+
+
+# Shared store used by the app and the worker
+CAMPAIGN_JOBS = JobStore()
+
+
+# ==================== APP HELPERS ====================
+
+def submit_campaign(leads, campaign, resume=True, store=CAMPAIGN_JOBS):
+    """
+    Hand a cleaned lead list to the background worker, starting it if needed
+    Returns: job_id
+    """
+    os.makedirs(CAMPAIGN_JOBS_DIR, exist_ok=True)
+    leads_path = os.path.abspath(os.path.join(CAMPAIGN_JOBS_DIR, f"{campaign}.csv"))
+    leads[['Name', 'Phone']].to_csv(leads_path, index=False)
+    job_id = store.submit(campaign, leads_path, len(leads), resume)
+    ensure_worker(store)
+    return job_id
+
+
+def ensure_worker(store=CAMPAIGN_JOBS):
+    """
+    Start the worker process unless a live one already exists
+    It is fully detached, so Streamlit reruns and server restarts don't stop it.
+    Returns: (started: bool, message: str)
+    """
+    if not store.reserve_worker():
+        return False, "Campaign worker already running"
+
+    script = os.path.abspath(__file__)
+    options = {}
+    if sys.platform == 'win32':
+        options['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS
+    else:
+        options['start_new_session'] = True
+    # Same working directory as the app - the ./firehox_* stores are relative to it
+    subprocess.Popen([sys.executable, script], cwd=os.getcwd(),
+                     stdin=subprocess.DEVNULL, **options)
+    return True, "✅ Campaign worker started"
+
+
+# ==================== WORKER ====================
+
+class Telemetry:
+    """
+    Throttled status channel from the worker to the job store for one job
+    Console events live in a fixed-size ring buffer and status fields are
+    batched, so the store sees at most one write per refresh interval no matter
+    how long the campaign runs or how often it reports. The cooldown is sent
+    once as an end time; the UI counts down by itself.
+    """
+
+    def __init__(self, store, job_id, buffer_size=TELEMETRY_BUFFER_SIZE, refresh_seconds=TELEMETRY_REFRESH_SECONDS):
+        self.store = store
+        self.job_id = job_id
+        self.refresh_seconds = refresh_seconds
+        self.events = deque(maxlen=buffer_size)
+        self._pending = {}
+        self._last_flush = 0.0
+        self._last_cancel_check = 0.0
+        self._cancelled = False
+        self._cooldown_until = None
+
+    def status(self, **fields):
+        """Queue status fields for the next flush"""
+        self._pending.update(fields)
+
+    def event(self, kind, text):
+        """Add a console line ('success', 'error', 'info' or 'warning'); the oldest one drops off when the buffer is full"""
+        self.events.append((kind, text))
+        self._pending['events'] = json.dumps(list(self.events))
+
+    def flush(self, force=False):
+        """Write queued fields, at most once per refresh interval unless forced"""
+        now = time.monotonic()
+        if not self._pending or (not force and now - self._last_flush < self.refresh_seconds):
+            return
+        self.store.update(self.job_id, **self._pending)
+        self._pending = {}
+        self._last_flush = now
+
+    def cooldown(self, remaining):
+        """wait_with_countdown callback: publish the end time once, then only watch for a stop request"""
+        if self._cooldown_until is None:
+            self._cooldown_until = time.time() + remaining
+            self.status(cooldown_until=self._cooldown_until)
+            self.flush(force=True)
+        if self.cancelled():
+            raise CampaignCancelled()
+
+    def cooldown_done(self):
+        self._cooldown_until = None
+        self.status(cooldown_until=None)
+
+    def cancelled(self):
+        """Stop request check, throttled to one read per refresh interval"""
+        now = time.monotonic()
+        if now - self._last_cancel_check >= self.refresh_seconds:
+            self._cancelled = self.store.cancel_requested(self.job_id)
+            self._last_cancel_check = now
+        return self._cancelled
+
+
+def run_campaign(job, store=CAMPAIGN_JOBS, journal=CAMPAIGN_JOURNAL, history=CONTACT_HISTORY):
+    """
+    Execute one campaign job: fresh browser, send to every lead not yet in the
+    journal with the anti-ban cooldown in between, close the browser
+    Progress is written to the job store as it happens.
+    """
+    job_id = job['job_id']
+    campaign = job['campaign_id']
+    leads = pd.read_csv(job['leads_path'], dtype=str, keep_default_na=False)
+    total_leads = len(leads)
+    telemetry = Telemetry(store, job_id)
+
+    already_processed = journal.start(campaign, total_leads, resume=bool(job['resume']))
+    progress = journal.progress(campaign)
+    sent_count, failed_count = progress['sent'], progress['failed']
+    telemetry.status(processed=progress['recorded'], sent=sent_count, failed=failed_count, events=None, cooldown_until=None)
+    telemetry.flush(force=True)
+    # Report files start from the journal, so a resumed campaign's files include earlier rows
+    results_writer = ResultsWriter(campaign, existing_rows=journal.results(campaign))
+
+    bot = WhatsAppBot()
+    watchdog = MemoryWatchdog(log=telemetry.event)
+    try:
+        # Attach to the warm browser host (started here if the app hasn't already)
+        host_ready, message, endpoint = ensure_browser_host()
+        if host_ready:
+            host_ready, message, page = bot.attach_browser(endpoint)
+        if not host_ready:
+            telemetry.status(state='failed', message=f"❌ {message}")
+            return
+
+        telemetry.status(message="✅ Browser attached! Waiting for WhatsApp to load...")
+        telemetry.flush(force=True)
+        # Continues the moment the chat list is visible (sends fail per lead if it never loads)
+        bot.wait_for_state(['logged_in'], timeout=WHATSAPP_LOAD_TIMEOUT_MS)
+
+        for seq_idx, (name, phone) in enumerate(zip(leads['Name'], leads['Phone'])):
+            if phone in already_processed:
+                continue
+            if telemetry.cancelled():
+                raise CampaignCancelled()
+
+            telemetry.status(current_lead=f"{name} ({phone})",
+                             message=f"📤 **Sending to:** {name} ({phone}) - **{seq_idx + 1}/{total_leads}**")
+            telemetry.flush()
+
+            status, timestamp = bot.send_message(phone, bot.generate_message(name))
+            # Journal first - durable on disk before anything else happens
+            journal.record(campaign, seq_idx, name, phone, status, timestamp)
+            results_writer.write(name, phone, status, timestamp)
+            if is_sent(status):
+                sent_count += 1
+                # Remember the number so later uploads skip it
+                history.record(phone, name, status, timestamp)
+                telemetry.event('success', f"[{timestamp}] ✅ SUCCESS: {name} ({phone})")
+            else:
+                failed_count += 1
+                telemetry.event('error', f"[{timestamp}] ❌ FAILED: {name} ({phone}) - {status}")
+            telemetry.status(processed=sent_count + failed_count, sent=sent_count, failed=failed_count)
+
+            # Recycle the tab (or browser) between sends if it has grown too big
+            watchdog.after_send(bot)
+            if bot.page is None:
+                raise RuntimeError("Browser could not be restarted after a memory recycle")
+
+            # Anti-ban delay (except for last message)
+            if seq_idx < total_leads - 1:
+                telemetry.status(message="⏳ **Cooling down...** (Anti-Ban Protection)")
+                bot.wait_with_countdown(*COOLDOWN_RANGE, telemetry.cooldown)
+                telemetry.cooldown_done()
+            else:
+                telemetry.flush(force=True)
+
+        journal.finish(campaign)
+        telemetry.status(state='done', current_lead=None, message="🎉 **Campaign Complete!**")
+
+    except CampaignCancelled:
+        telemetry.status(state='cancelled', current_lead=None, cooldown_until=None,
+                         message="⏹️ Campaign stopped - start it again to resume")
+    except Exception as e:
+        print(f"❌ Campaign {campaign} failed: {e}")
+        telemetry.status(state='failed', current_lead=None, cooldown_until=None,
+                         message=f"❌ Campaign stopped: {str(e)}")
+    finally:
+        # Detach only - the browser host keeps WhatsApp Web loaded for the next campaign
+        bot.close_browser()
+        results_writer.close()
+        telemetry.flush(force=True)
+
+
+def run_worker(store=CAMPAIGN_JOBS, idle_exit_seconds=WORKER_IDLE_EXIT_SECONDS):
+    """Worker main loop: run queued jobs one at a time, exit when idle for a while"""
+    pid = os.getpid()
+    if not store.register_worker(pid):
+        print("⚠️ Another campaign worker is already running - exiting")
+        return
+
+    # Heartbeat from a side thread, so long sends never make the worker look dead
+    stopped = threading.Event()
+
+    def beat():
+        while not stopped.wait(WORKER_HEARTBEAT_SECONDS):
+            store.heartbeat(pid)
+
+    threading.Thread(target=beat, daemon=True).start()
+    print(f"🚀 Campaign worker {pid} started")
+
+    try:
+        idle_since = time.time()
+        while True:
+            job = store.claim_next()
+            if job is None:
+                if time.time() - idle_since > idle_exit_seconds and store.retire_worker(pid):
+                    print("💤 No campaigns queued - worker exiting")
+                    break
+                time.sleep(WORKER_POLL_SECONDS)
+                continue
+            print(f"📤 Running campaign {job['campaign_id']} (job {job['job_id']})")
+            run_campaign(job, store)
+            idle_since = time.time()
+    finally:
+        stopped.set()
+        store.unregister_worker(pid)
+
+
+if __name__ == "__main__":
+    run_worker()
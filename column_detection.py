@@ -0,0 +1,127 @@
+"""
+FireHox Column Detection - Phone & Name Column Scoring
+Single source of truth for the Step 2 predictions and WhatsAppBot.clean_data
+"""
+
+import threading
+from collections import OrderedDict
+
+# Header keywords
+PHONE_KEYWORDS = ['phone', 'mobile', 'contact', 'tel', 'number', 'whatsapp', 'cell', 'digits', 'ph']
+NAME_KEYWORDS = ['business', 'company', 'name', 'client', 'customer', 'lead', 'title', 'shop', 'cafe', 'restaurant', 'store']
+EXACT_NAME_COLUMNS = ['business name', 'name', 'business', 'company name']
+
+# Rows scored per column
+SAMPLE_ROWS = 500
+# Below this the best phone candidate is not trusted
+MIN_PHONE_CONFIDENCE = 0.25
+# Detections remembered per uploaded file
+DETECTION_CACHE_SIZE = 64
+
+_detection_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _keyword_score(column, keywords, exact_matches):
+    """1.0 for an exact header match, 0.5 when a keyword is contained in it, else 0"""
+    header = column.lower().strip()
+    if header in exact_matches:
+        return 1.0
+    if any(key in header for key in keywords):
+        return 0.5
+    return 0.0
+
+
+def _sample_values(series):
+    """Non-empty sample values as stripped strings"""
+    values = series.dropna().astype(str).str.strip()
+    return values[(values != '') & (values.str.lower() != 'nan')]
+
+
+def _phone_content_score(values):
+    """Share of values that look like phone numbers: 7-15 digits and mostly digits"""
+    if values.empty:
+        return 0.0
+    digit_count = values.str.count(r'\d')
+    digit_density = digit_count / values.str.len()
+    phone_like = digit_count.between(7, 15) & (digit_density >= 0.6)
+    return float(phone_like.mean())
+
+
+def _name_content_score(values):
+    """Share of text-like values (letters, few digits, sane length), weighted with uniqueness"""
+    if values.empty:
+        return 0.0
+    lengths = values.str.len()
+    digit_density = values.str.count(r'\d') / lengths
+    text_like = values.str.contains(r'[^\W\d_]', regex=True) & (digit_density < 0.3) & lengths.between(2, 80)
+    unique_ratio = values.nunique() / len(values)
+    return float(0.7 * text_like.mean() + 0.3 * unique_ratio)
+
+
+def score_columns(df, sample_rows=SAMPLE_ROWS):
+    """
+    Score every column as a phone and as a name candidate on a sample of rows
+
+    Returns: dict with 'phone' and 'name' lists of (column, confidence 0-1),
+    best candidate first. 'Unnamed' columns are never name candidates.
+    """
+    sample = df.head(sample_rows)
+    phone_candidates = []
+    name_candidates = []
+
+    for column in df.columns:
+        values = _sample_values(sample[column])
+        header = str(column)
+
+        phone_score = 0.4 * _keyword_score(header, PHONE_KEYWORDS, PHONE_KEYWORDS) + 0.6 * _phone_content_score(values)
+        phone_candidates.append((column, round(phone_score, 3)))
+
+        if 'unnamed' not in header.lower():
+            name_score = 0.5 * _keyword_score(header, NAME_KEYWORDS, EXACT_NAME_COLUMNS) + 0.5 * _name_content_score(values)
+            name_candidates.append((column, round(name_score, 3)))
+
+    # Stable sort keeps the file's column order between equal scores
+    phone_candidates.sort(key=lambda candidate: candidate[1], reverse=True)
+    name_candidates.sort(key=lambda candidate: candidate[1], reverse=True)
+    return {'phone': phone_candidates, 'name': name_candidates}
+
+
+def detect_columns(df, phone_col=None, name_col=None, sample_rows=SAMPLE_ROWS, file_hash=None):
+    """
+    Pick the phone and name columns, honouring manual overrides
+
+    file_hash: content hash of the upload - scores are cached per hash, so
+    Streamlit reruns on the same file never re-score it
+    Returns: (phone_column, name_column, scores) - phone_column is None when no
+    column is a convincing phone candidate
+    """
+    scores = None
+    if file_hash is not None:
+        with _cache_lock:
+            scores = _detection_cache.get((file_hash, sample_rows))
+            if scores is not None:
+                _detection_cache.move_to_end((file_hash, sample_rows))
+
+    if scores is None:
+        scores = score_columns(df, sample_rows)
+        if file_hash is not None:
+            with _cache_lock:
+                _detection_cache[(file_hash, sample_rows)] = scores
+                while len(_detection_cache) > DETECTION_CACHE_SIZE:
+                    _detection_cache.popitem(last=False)
+
+    target_phone = phone_col
+    if not target_phone and scores['phone'] and scores['phone'][0][1] >= MIN_PHONE_CONFIDENCE:
+        target_phone = scores['phone'][0][0]
+    if not target_phone:
+        return None, None, scores
+
+    target_name = name_col
+    if not target_name:
+        # Best name candidate that isn't the phone column, else the first other column
+        target_name = next((col for col, _ in scores['name'] if col != target_phone), None)
+    if not target_name:
+        target_name = next((col for col in df.columns if col != target_phone), target_phone)
+
+    return target_phone, target_name, scores
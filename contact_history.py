@@ -0,0 +1,87 @@
+"""
+FireHox Contact History - Already-Contacted Index
+SQLite record of every number a campaign has messaged, checked in bulk by clean_data
+"""
+
+import threading
+import pandas as pd
+from local_store import sqlite_connection
+
+# Lives next to the WhatsApp session so it survives app restarts
+CONTACT_HISTORY_DB = "./firehox_contact_history.db"
+
+
+class ContactHistory:
+    """
+    On-disk index of previously contacted E.164 numbers
+    Lookups load the candidate numbers into a temp table and resolve them with
+    a single join, so checking 100k leads costs one query instead of 100k.
+    """
+
+    def __init__(self, path=CONTACT_HISTORY_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._schema_lock = threading.Lock()
+        self._ready = False
+
+    def _ensure_schema(self):
+        """Create the table on first use - importing the module leaves the disk untouched"""
+        with self._schema_lock:
+            if self._ready:
+                return
+            with sqlite_connection(self.path) as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS contacted ("
+                    " phone TEXT PRIMARY KEY,"
+                    " name TEXT,"
+                    " status TEXT,"
+                    " contacted_at TEXT"
+                    ") WITHOUT ROWID"
+                )
+            self._ready = True
+
+    def _connect(self):
+        self._ensure_schema()
+        return sqlite_connection(self.path)
+
+    def record(self, phone, name, status, contacted_at):
+        """Remember one contacted number (the latest contact wins)"""
+        self.record_many([(phone, name, status, contacted_at)])
+
+    def record_many(self, rows):
+        """Remember many (phone, name, status, contacted_at) rows in one transaction"""
+        with self._lock, self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO contacted VALUES (?, ?, ?, ?)", rows)
+
+    def contacted_mask(self, phones):
+        """
+        Bulk membership test
+        Returns: boolean Series aligned with `phones`, True where the number was contacted before
+        """
+        if len(phones) == 0:
+            return pd.Series(False, index=phones.index)
+
+        with self._lock, self._connect() as conn:
+            conn.execute("CREATE TEMP TABLE candidates (phone TEXT PRIMARY KEY) WITHOUT ROWID")
+            conn.executemany("INSERT OR IGNORE INTO candidates VALUES (?)", ((p,) for p in phones.unique()))
+            found = [row[0] for row in conn.execute("SELECT phone FROM candidates JOIN contacted USING (phone)")]
+            conn.execute("DROP TABLE candidates")
+        return phones.isin(found)
+
+    def count(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM contacted").fetchone()[0]
+
+    def fingerprint(self):
+        """Changes whenever the index changes - used as part of cache keys for cleaning results"""
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*), MAX(contacted_at) FROM contacted").fetchone()
+
+    def clear(self):
+        """Forget every contacted number"""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM contacted")
+
+
+# Shared index used by the app
+CONTACT_HISTORY = ContactHistory()
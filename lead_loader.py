@@ -0,0 +1,357 @@
+"""
+FireHox Lead Loader - Upload Reading for Step 2
+Two-phase loading (header + sample, then only the chosen columns) and
+chunked CSV ingestion so huge lead exports are cleaned in bounded memory
+"""
+
+import hashlib
+import importlib.util
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from whatsapp_engine import WhatsAppBot
+
+# CSV uploads bigger than this are streamed through clean_data_stream instead of loaded whole
+STREAMING_THRESHOLD_BYTES = 50 * 1024 * 1024
+# Rows per chunk while streaming
+CSV_CHUNK_ROWS = 100000
+# Rows read up front (header + sample) for column detection and the preview table
+PREVIEW_ROWS = 1000
+
+# Tried in order - latin1 accepts any byte sequence, so it is the final fallback
+CSV_ENCODINGS = ('utf-8', 'latin1')
+
+# Parsed frames and cleaning results kept across Streamlit reruns
+UPLOAD_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# clean_data options that change the result (workers / phone_cache only change speed)
+# Options with a fingerprint() (e.g. ContactHistory, SuppressionList) are keyed on their current state
+RESULT_OPTIONS = ('default_country_code', 'phone_col', 'name_col', 'contact_history', 'suppression_list')
+
+# Content hashes remembered per Streamlit upload (file_id -> sha256)
+_upload_hashes = OrderedDict()
+_UPLOAD_HASHES_SIZE = 64
+
+
+def upload_hash(uploaded_file):
+    """
+    SHA-256 of the upload's bytes, computed once per uploaded file
+    Streamlit keeps the same file_id across reruns, so later calls are free.
+    """
+    file_id = getattr(uploaded_file, 'file_id', None)
+    if file_id is not None and file_id in _upload_hashes:
+        return _upload_hashes[file_id]
+    
+    digest = hashlib.sha256(uploaded_file.getbuffer()).hexdigest()
+    if file_id is not None:
+        _upload_hashes[file_id] = digest
+        while len(_upload_hashes) > _UPLOAD_HASHES_SIZE:
+            _upload_hashes.popitem(last=False)
+    return digest
+
+
+class UploadCache:
+    """
+    LRU cache of parsed uploads and cleaning results, bounded by memory size
+    Keys start with the upload's content hash, so re-uploading the same file
+    (or any rerun) hits the cache. Cached frames are shared - treat them as read-only.
+    """
+    
+    def __init__(self, max_bytes=UPLOAD_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _size_of(value):
+        """Approximate memory footprint of a cached frame or (frame, report) pair"""
+        frames = value if isinstance(value, tuple) else (value,)
+        return sum(int(f.memory_usage(deep=True).sum()) for f in frames if isinstance(f, pd.DataFrame))
+    
+    def get(self, key):
+        """Returns: cached value or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, key, value):
+        """Store a value, evicting least recently used entries over the byte budget"""
+        size = self._size_of(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+            self._entries[key] = (value, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+
+# Shared by every Streamlit session on this server
+UPLOAD_CACHE = UploadCache()
+
+
+# ==================== EXCEL READERS ====================
+# pandas' default na_values, applied by the openpyxl reader to match pd.read_excel
+EXCEL_NA_STRINGS = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+]
+
+def _read_excel_calamine(uploaded_file, usecols=None, nrows=None, sheet_name=0):
+    """Rust-based calamine engine (pip install python-calamine) - several times faster than openpyxl"""
+    uploaded_file.seek(0)
+    return pd.read_excel(uploaded_file, engine='calamine', sheet_name=sheet_name,
+                         usecols=usecols, nrows=nrows, dtype=str)
+
+
+def _excel_cell_text(value):
+    """Cell value as text, the way pandas' dtype=str would render it"""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def _read_excel_openpyxl(uploaded_file, usecols=None, nrows=None, sheet_name=0):
+    """
+    openpyxl in read-only mode: rows are streamed from the sheet XML instead of
+    building the whole workbook in memory, and only `usecols` are kept
+    """
+    from openpyxl import load_workbook
+    
+    uploaded_file.seek(0)
+    workbook = load_workbook(uploaded_file, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[sheet_name] if isinstance(sheet_name, int) else workbook[sheet_name]
+        rows = sheet.iter_rows(values_only=True)
+        header_row = next(rows, ())
+        
+        # Same header naming as pandas: numbers and dates keep their type, blanks become
+        # 'Unnamed: i', repeats get '.1', '.2', ...
+        header = []
+        for i, value in enumerate(header_row):
+            if isinstance(value, float) and value.is_integer():
+                value = int(value)
+            name = f"Unnamed: {i}" if value is None or value == "" else value
+            base, repeat = name, 1
+            while name in header:
+                name = f"{base}.{repeat}"
+                repeat += 1
+            header.append(name)
+        
+        wanted = usecols if usecols is not None else header
+        missing = [col for col in wanted if col not in header]
+        if missing:
+            raise ValueError(f"Columns not found in sheet: {missing}")
+        positions = [header.index(col) for col in wanted]
+        
+        data = {col: [] for col in wanted}
+        row_count = 0
+        blank_run = 0
+        for row in rows:
+            if nrows is not None and row_count + blank_run >= nrows:
+                break
+            # Blank rows stay as all-NaN rows, like pandas - except trailing ones, which
+            # pandas trims, so they are only written once a non-blank row follows
+            if all(value is None for value in row):
+                blank_run += 1
+                continue
+            for col, pos in zip(wanted, positions):
+                data[col].extend([None] * blank_run)
+                data[col].append(_excel_cell_text(row[pos]) if pos < len(row) else None)
+            row_count += 1 + blank_run
+            blank_run = 0
+        
+        frame = pd.DataFrame(data, columns=wanted)
+        # Empty cells and pandas' default NA strings ('nan', 'N/A', ...) as NaN, like pd.read_excel
+        return frame.where(frame.notna() & ~frame.isin(EXCEL_NA_STRINGS), np.nan)
+    finally:
+        workbook.close()
+
+
+# First installed engine wins: (label, module that must be importable, reader)
+EXCEL_READERS = [
+    ('calamine', 'python_calamine', _read_excel_calamine),
+    ('openpyxl (read-only)', 'openpyxl', _read_excel_openpyxl),
+]
+
+
+def excel_reader():
+    """Returns: (label, reader function) of the fastest installed Excel engine"""
+    for label, module, reader in EXCEL_READERS:
+        if importlib.util.find_spec(module) is not None:
+            return label, reader
+    raise ImportError("No Excel reader installed. Run: pip install openpyxl")
+
+
+def read_excel(uploaded_file, usecols=None, nrows=None, sheet_name=0):
+    """
+    Read one sheet (first by default) of an .xlsx upload with the fastest available engine
+    Returns: (DataFrame of text columns, reader label)
+    """
+    label, reader = excel_reader()
+    return reader(uploaded_file, usecols=usecols, nrows=nrows, sheet_name=sheet_name), label
+
+
+def read_csv(uploaded_file, **read_options):
+    """
+    Read a CSV upload with encoding fallback for Excel/Windows-formatted files
+    Returns: DataFrame
+    """
+    for encoding in CSV_ENCODINGS:
+        try:
+            uploaded_file.seek(0)
+            return pd.read_csv(uploaded_file, encoding=encoding, **read_options)
+        except UnicodeDecodeError:
+            if encoding == CSV_ENCODINGS[-1]:
+                raise
+
+
+def read_sample(uploaded_file, nrows=PREVIEW_ROWS):
+    """
+    Phase 1 of the two-phase load: header + first rows only, as text
+    Enough for column detection and the preview table.
+    Returns: DataFrame with every column but at most `nrows` rows
+    """
+    key = (upload_hash(uploaded_file), 'sample', nrows)
+    sample = UPLOAD_CACHE.get(key)
+    if sample is None:
+        start = time.perf_counter()
+        if uploaded_file.name.endswith('.xlsx'):
+            sample, reader = read_excel(uploaded_file, nrows=nrows)
+        else:
+            sample, reader = read_csv(uploaded_file, nrows=nrows, dtype=str), 'csv'
+        # Read metadata travels with the cached frame for the data report
+        sample.attrs['read_seconds'] = time.perf_counter() - start
+        sample.attrs['reader'] = reader
+        UPLOAD_CACHE.put(key, sample)
+    return sample
+
+
+def read_columns(uploaded_file, columns, sample=None):
+    """
+    Phase 2 of the two-phase load: only the chosen columns, as text
+    When the phase 1 sample already holds the whole file it is reused instead.
+    Returns: DataFrame with just `columns`
+    """
+    usecols = list(dict.fromkeys(columns))
+    if sample is not None and len(sample) < PREVIEW_ROWS:
+        frame = sample[usecols]
+        frame.attrs = {'read_seconds': 0.0, 'reader': sample.attrs.get('reader')}
+        return frame
+    
+    key = (upload_hash(uploaded_file), 'columns', tuple(usecols))
+    frame = UPLOAD_CACHE.get(key)
+    if frame is None:
+        start = time.perf_counter()
+        if uploaded_file.name.endswith('.xlsx'):
+            frame, reader = read_excel(uploaded_file, usecols=usecols)
+        else:
+            frame, reader = read_csv(uploaded_file, usecols=usecols, dtype=str), 'csv'
+        frame.attrs['read_seconds'] = time.perf_counter() - start
+        frame.attrs['reader'] = reader
+        UPLOAD_CACHE.put(key, frame)
+    return frame
+
+
+def _timed_chunks(chunks, timing):
+    """Yield chunks while adding the time spent reading them to timing['read_seconds']"""
+    iterator = iter(chunks)
+    while True:
+        start = time.perf_counter()
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            timing['read_seconds'] += time.perf_counter() - start
+        yield chunk
+
+
+def clean_csv_stream(uploaded_file, columns=None, chunksize=CSV_CHUNK_ROWS, **clean_options):
+    """
+    Stream a CSV upload through WhatsAppBot.clean_data_stream chunk by chunk
+    Only `columns` are parsed when given (None = all columns).
+
+    Everything is read as text so every chunk gets the same dtypes (a chunk
+    with a blank cell would otherwise turn numeric phones into floats).
+    A decode error part-way through restarts the stream with the next encoding.
+    Returns: (valid_df, report) like WhatsAppBot.clean_data
+    """
+    for encoding in CSV_ENCODINGS:
+        try:
+            uploaded_file.seek(0)
+            usecols = list(dict.fromkeys(columns)) if columns else None
+            chunks = pd.read_csv(uploaded_file, encoding=encoding, dtype=str, usecols=usecols, chunksize=chunksize)
+            read_timing = {'read_seconds': 0.0}
+            with chunks:
+                cleaned_df, report = WhatsAppBot.clean_data_stream(_timed_chunks(chunks, read_timing), **clean_options)
+            if cleaned_df is not None:
+                report['read_seconds'] = read_timing['read_seconds']
+                report['reader'] = 'csv (streaming)'
+            return cleaned_df, report
+        except UnicodeDecodeError:
+            if encoding == CSV_ENCODINGS[-1]:
+                raise
+            print(f"⚠️ {encoding} decoding failed, restarting stream with fallback encoding")
+
+
+def clean_upload(uploaded_file, columns, sample=None, **clean_options):
+    """
+    Clean an upload's chosen columns, reusing the previous result when the
+    file and the result-affecting options are unchanged
+    Large CSVs go through clean_csv_stream, everything else through the two-phase load.
+    Returns: (valid_df, report) like WhatsAppBot.clean_data
+    """
+    result_options = tuple(
+        (name, value.fingerprint() if hasattr(value, 'fingerprint') else value)
+        for name, value in ((name, clean_options.get(name)) for name in RESULT_OPTIONS)
+    )
+    key = (upload_hash(uploaded_file), 'clean', tuple(columns), result_options)
+    cached = UPLOAD_CACHE.get(key)
+    if cached is not None:
+        cleaned_df, report = cached
+        return cleaned_df, dict(report)
+    
+    if should_stream(uploaded_file):
+        # Re-read the whole upload chunk by chunk, keeping only valid rows
+        cleaned_df, report = clean_csv_stream(uploaded_file, columns=columns, **clean_options)
+    else:
+        # Phase 2: load only the chosen columns, then clean them
+        lead_df = read_columns(uploaded_file, columns, sample=sample)
+        cleaned_df, report = WhatsAppBot.clean_data(lead_df, **clean_options)
+        if cleaned_df is not None:
+            # Header/sample read plus the column re-read (0 when the sample was reused)
+            report['read_seconds'] = lead_df.attrs.get('read_seconds', 0.0)
+            if sample is not None:
+                report['read_seconds'] += sample.attrs.get('read_seconds', 0.0)
+            report['reader'] = lead_df.attrs.get('reader')
+    
+    if cleaned_df is not None:
+        UPLOAD_CACHE.put(key, (cleaned_df, dict(report)))
+    return cleaned_df, report
+
+
+def should_stream(uploaded_file):
+    """Large CSV uploads are cleaned in streaming mode"""
+    return uploaded_file.name.endswith('.csv') and uploaded_file.size > STREAMING_THRESHOLD_BYTES
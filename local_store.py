@@ -0,0 +1,63 @@
+"""
+FireHox Local Store - Shared Helpers for the ./firehox_* Files
+Short-lived SQLite connections and crash-safe file writes, used by every on-disk store
+"""
+
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+
+
+@contextmanager
+def sqlite_connection(path, pragmas=(), immediate=False, row_factory=None):
+    """
+    One short-lived connection per call: commit on success, roll back on error, always close
+    pragmas: statements run before the transaction (e.g. "PRAGMA synchronous=FULL")
+    immediate: take the write lock up front (BEGIN IMMEDIATE), so concurrent
+    read-then-write transactions queue instead of failing halfway
+    """
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    if row_factory is not None:
+        conn.row_factory = row_factory
+    try:
+        for pragma in pragmas:
+            conn.execute(pragma)
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+
+def enable_wal(path):
+    """Switch a database to WAL mode (readers never block the writer) - must run outside a transaction"""
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+    finally:
+        conn.close()
+
+
+def atomic_write(path, write, binary=False):
+    """
+    Write a file through a temp file + os.replace, so a crash never leaves it half-written
+    write: callable(file) that writes the content; the temp name includes the pid, so
+    processes saving the same file at once never share a temp file
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if binary:
+        with open(tmp_path, "wb") as f:
+            write(f)
+    else:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            write(f)
+    os.replace(tmp_path, path)
+
+
+def atomic_write_json(path, data, **dump_options):
+    atomic_write(path, lambda f: json.dump(data, f, **dump_options))
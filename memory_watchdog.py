@@ -0,0 +1,172 @@
+"""
+FireHox Memory Watchdog - Browser Memory Limits for Long Campaigns
+Samples the WhatsApp tab's JS heap and DOM node count (CDP Performance metrics)
+and the browser's resident memory between sends, and recycles the tab - or the
+whole browser - before a small headless host slows down or runs out of memory
+"""
+
+import sys
+import time
+from whatsapp_engine import PlaywrightError
+from browser_host import ensure_browser_host, stop_browser_host
+
+# Sample after every this many sends
+MEMORY_SAMPLE_EVERY = 5
+
+# Recycle thresholds - the tab when its own metrics are over, the browser when its RSS
+# stays over even with a fresh tab
+JS_HEAP_LIMIT_MB = 350
+DOM_NODES_LIMIT = 150000
+BROWSER_RSS_LIMIT_MB = 1500
+
+# Longest wait for WhatsApp Web's chat list in a recycled tab
+RECYCLE_LOAD_TIMEOUT_MS = 30000
+
+
+def _print_log(kind, text):
+    print(text)
+
+
+def process_rss_mb(pid):
+    """Returns: resident memory of a process in MB (Linux /proc), or None where unavailable"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        return None
+    return None
+
+
+class MemoryWatchdog:
+    """
+    Watches one bot's browser between sends
+    Recycling keeps the login: a new tab in the same persistent context, or a
+    restarted browser host on the same profile.
+    """
+
+    def __init__(self, sample_every=MEMORY_SAMPLE_EVERY, js_heap_limit_mb=JS_HEAP_LIMIT_MB,
+                 dom_nodes_limit=DOM_NODES_LIMIT, browser_rss_limit_mb=BROWSER_RSS_LIMIT_MB,
+                 log=_print_log):
+        """log: callable(kind, text) with kind 'info', 'warning' or 'error' (e.g. Telemetry.event)"""
+        self.sample_every = sample_every
+        self.js_heap_limit_mb = js_heap_limit_mb
+        self.dom_nodes_limit = dom_nodes_limit
+        self.browser_rss_limit_mb = browser_rss_limit_mb
+        self.log = log
+        self.sends = 0
+        self.recycles = {'page': 0, 'context': 0}
+        self._page = None
+        self._page_session = None
+
+    def sample(self, bot):
+        """
+        Returns: dict with js_heap_mb and dom_nodes of the tab and browser_rss_mb
+        (sum over the browser's processes; None when it can't be read)
+        """
+        if self._page is not bot.page:
+            # One CDP session per tab; a recycled tab needs a new one
+            self._page = bot.page
+            self._page_session = bot.context.new_cdp_session(bot.page)
+            self._page_session.send("Performance.enable")
+        metrics = {
+            metric['name']: metric['value']
+            for metric in self._page_session.send("Performance.getMetrics")['metrics']
+        }
+        return {
+            'js_heap_mb': round(metrics.get('JSHeapUsedSize', 0) / 1024 / 1024, 1),
+            'dom_nodes': int(metrics.get('Nodes', 0)),
+            'browser_rss_mb': self._browser_rss_mb(bot),
+        }
+
+    def _browser_rss_mb(self, bot):
+        """Sum of RSS over all browser processes (pids from CDP SystemInfo)"""
+        if bot.browser is None:
+            return None  # Only reachable through the browser host's CDP connection
+        try:
+            session = bot.browser.new_browser_cdp_session()
+            try:
+                processes = session.send("SystemInfo.getProcessInfo")['processInfo']
+            finally:
+                session.detach()
+        except PlaywrightError:
+            return None
+        sizes = [process_rss_mb(process['id']) for process in processes]
+        sizes = [size for size in sizes if size is not None]
+        return round(sum(sizes), 1) if sizes else None
+
+    def after_send(self, bot):
+        """
+        Call after each send: samples every `sample_every` sends and recycles over a limit
+        Returns: (sample dict or None, action taken: None, 'page' or 'context')
+        """
+        self.sends += 1
+        if self.sends % self.sample_every:
+            return None, None
+        try:
+            sample = self.sample(bot)
+        except PlaywrightError as e:
+            self.log('warning', f"⚠️ Memory sample failed: {str(e)[:80]}")
+            return None, None
+        self.log('info', f"🧠 Tab heap {sample['js_heap_mb']} MB, {sample['dom_nodes']:,} DOM nodes, "
+                         f"browser RSS {sample['browser_rss_mb'] if sample['browser_rss_mb'] is not None else '?'} MB")
+
+        tab_over = sample['js_heap_mb'] > self.js_heap_limit_mb or sample['dom_nodes'] > self.dom_nodes_limit
+        browser_over = sample['browser_rss_mb'] is not None and sample['browser_rss_mb'] > self.browser_rss_limit_mb
+        if not (tab_over or browser_over):
+            return sample, None
+
+        # A fresh tab is cheap and usually enough; restart the browser only if it wasn't
+        if not self.recycle_page(bot):
+            return sample, None
+        if browser_over:
+            browser_rss_mb = self._browser_rss_mb(bot)
+            if browser_rss_mb is not None and browser_rss_mb > self.browser_rss_limit_mb:
+                return sample, 'context' if self.recycle_context(bot) else 'page'
+        return sample, 'page'
+
+    def recycle_page(self, bot):
+        """
+        Swap the WhatsApp tab for a fresh one in the same context
+        The old tab closes before WhatsApp Web loads in the new one, since WhatsApp
+        only runs in one tab at a time. Returns: True on success
+        """
+        started = time.monotonic()
+        try:
+            old_page = bot.page
+            bot.page = bot.context.new_page()  # Opened first so the browser never runs out of tabs
+            old_page.close()
+            bot.page.goto("https://web.whatsapp.com", timeout=60000, wait_until="domcontentloaded")
+            state, _ = bot.wait_for_state(['logged_in'], timeout=RECYCLE_LOAD_TIMEOUT_MS)
+        except PlaywrightError as e:
+            self.log('error', f"❌ Tab recycle failed: {str(e)[:80]}")
+            return False
+        self.recycles['page'] += 1
+        if state != 'logged_in':
+            self.log('warning', "⚠️ Recycled tab did not show the chat list in time")
+        self.log('info', f"♻️ WhatsApp tab recycled in {time.monotonic() - started:.1f}s")
+        return True
+
+    def recycle_context(self, bot):
+        """
+        Restart the browser host and reattach - the profile on disk keeps the login
+        Returns: True on success
+        """
+        started = time.monotonic()
+        bot.close_browser()
+        stopped, message = stop_browser_host()
+        if not stopped:
+            self.log('warning', message)
+        ready, message, endpoint = ensure_browser_host()
+        if ready:
+            ready, message, _ = bot.attach_browser(endpoint)
+        if not ready:
+            self.log('error', f"❌ Browser restart failed: {message}")
+            return False
+        bot.wait_for_state(['logged_in'], timeout=RECYCLE_LOAD_TIMEOUT_MS)
+        self.recycles['context'] += 1
+        self.log('info', f"♻️ Browser restarted in {time.monotonic() - started:.1f}s")
+        return True
@@ -0,0 +1,112 @@
+"""
+FireHox Request Filter - Lean WhatsApp Web Page Loads
+Routes the browser context's requests and aborts the ones the bot never looks at
+(avatars, media thumbnails, stickers, fonts) while the app's scripts, styles,
+XHR and websocket traffic pass through untouched
+"""
+
+import json
+import re
+import sys
+import time
+from local_store import atomic_write_json
+
+# On by default on the headless Linux host; note that Playwright disables the HTTP
+# cache for a context once routing is enabled, so desktop runs keep it off
+REQUEST_FILTER_ENABLED = sys.platform.startswith("linux")
+
+BLOCKED_RESOURCE_TYPES = ('image', 'media', 'font')
+BLOCKED_URL_PATTERNS = [
+    r"^https://pps\.whatsapp\.net/",               # Profile pictures
+    r"^https://mmg\.whatsapp\.net/",               # Media, thumbnails and stickers
+    r"^https://media[^/]*\.whatsapp\.net/",        # Media CDN
+    r"\.(?:woff2?|ttf|otf)(?:\?|$)",               # Web fonts fetched by other means
+]
+
+# Blocked requests never download, so savings use typical sizes per resource type
+ESTIMATED_BYTES = {'image': 25_000, 'media': 250_000, 'font': 40_000}
+ESTIMATED_BYTES_OTHER = 15_000
+
+# Per-session stats written by the browser host for the app to show
+REQUEST_FILTER_STATS_FILE = "./firehox_request_filter.json"
+REQUEST_FILTER_FLUSH_SECONDS = 5
+
+
+class RequestFilter:
+    """
+    context.route handler that aborts unwanted requests and counts what it saved
+    Install it in a process that is always waiting on Playwright (the browser host):
+    routed requests are paused until their handler runs.
+    """
+
+    def __init__(self, resource_types=BLOCKED_RESOURCE_TYPES, url_patterns=BLOCKED_URL_PATTERNS,
+                 stats_path=None):
+        self.resource_types = frozenset(resource_types)
+        self.url_pattern = re.compile("|".join(f"(?:{pattern})" for pattern in url_patterns)) if url_patterns else None
+        self.stats_path = stats_path
+        self.started_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        self.allowed = 0
+        self.blocked = {}
+        self._dirty = False
+        self._last_flush = 0.0
+
+    def should_block(self, resource_type, url):
+        """Returns: True if the request is a blocked resource type or matches a blocked URL pattern"""
+        if resource_type in self.resource_types:
+            return True
+        return bool(self.url_pattern and self.url_pattern.search(url))
+
+    def install(self, context):
+        """Route every request of the context through the filter"""
+        context.route("**/*", self._handle)
+
+    def _handle(self, route):
+        request = route.request
+        try:
+            if self.should_block(request.resource_type, request.url):
+                self.blocked[request.resource_type] = self.blocked.get(request.resource_type, 0) + 1
+                route.abort("blockedbyclient")
+            else:
+                self.allowed += 1
+                route.continue_()
+        except Exception:
+            pass  # Request was cancelled meanwhile (page navigated away)
+        self._dirty = True
+
+    def stats(self):
+        """
+        Returns: dict with blocked/allowed request counts, blocked counts per resource type
+        and the estimated bytes saved this session
+        """
+        return {
+            'started_at': self.started_at,
+            'allowed_requests': self.allowed,
+            'blocked_requests': sum(self.blocked.values()),
+            'blocked_by_type': dict(self.blocked),
+            'estimated_bytes_saved': sum(
+                count * ESTIMATED_BYTES.get(resource_type, ESTIMATED_BYTES_OTHER)
+                for resource_type, count in self.blocked.items()
+            ),
+        }
+
+    def flush(self, force=False):
+        """Write the stats file if anything changed since the last write (throttled)"""
+        if self.stats_path is None or not (self._dirty or force):
+            return
+        if not force and time.monotonic() - self._last_flush < REQUEST_FILTER_FLUSH_SECONDS:
+            return
+        try:
+            atomic_write_json(self.stats_path, self.stats())
+            self._dirty = False
+            self._last_flush = time.monotonic()
+        except OSError as e:
+            print(f"⚠️ Could not save request filter stats: {e}")
+
+
+def read_filter_stats(path=REQUEST_FILTER_STATS_FILE):
+    """Returns: the browser host's current session stats, or None when filtering is off"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
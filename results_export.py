@@ -0,0 +1,91 @@
+"""
+FireHox Results Export - Incremental Campaign Reports
+Each result row is appended to an on-disk CSV (and optionally Parquet) as soon as it is
+produced, so downloads serve the file as-is and partial results exist mid-campaign
+"""
+
+import csv
+import os
+
+RESULTS_DIR = "./firehox_results"
+RESULT_COLUMNS = ['Name', 'Phone', 'Status', 'Timestamp']
+
+# Parquet needs pyarrow (installed with Streamlit); rows are buffered into row groups of this size
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+PARQUET_ROW_GROUP_ROWS = 500
+
+
+def results_path(campaign, file_format="csv"):
+    """Returns: path of a campaign's results file ('csv' or 'parquet')"""
+    return os.path.join(RESULTS_DIR, f"campaign_{campaign}.{file_format}")
+
+
+class ResultsWriter:
+    """
+    Append-only writer for one campaign's results
+    The CSV is flushed after every row, so it can be downloaded mid-campaign.
+    The Parquet file (optional) is only complete once close() writes its footer.
+    """
+
+    def __init__(self, campaign, existing_rows=None, parquet=PARQUET_AVAILABLE):
+        """
+        existing_rows: DataFrame of rows already processed (a resumed campaign) -
+        the files are rewritten from it so they always match the journal
+        """
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        self.csv_path = results_path(campaign, "csv")
+        self._csv_file = open(self.csv_path, "w", newline="", encoding="utf-8")
+        self._csv = csv.writer(self._csv_file)
+        self._csv.writerow(RESULT_COLUMNS)
+
+        self.parquet_path = None
+        self._parquet = None
+        self._buffer = []
+        if parquet and PARQUET_AVAILABLE:
+            self.parquet_path = results_path(campaign, "parquet")
+            schema = pa.schema([(column, pa.string()) for column in RESULT_COLUMNS])
+            self._parquet = pq.ParquetWriter(self.parquet_path, schema)
+
+        if existing_rows is not None and len(existing_rows):
+            rows = existing_rows[RESULT_COLUMNS].astype(str).itertuples(index=False, name=None)
+            for row in rows:
+                self._csv.writerow(row)
+                self._buffer_row(row)
+            self._csv_file.flush()
+            self._write_row_group()
+
+    def write(self, name, phone, status, timestamp):
+        """Append one result row"""
+        row = (name, phone, status, timestamp)
+        self._csv.writerow(row)
+        self._csv_file.flush()
+        self._buffer_row(row)
+
+    def _buffer_row(self, row):
+        """Collect a row for the next Parquet row group (no-op without Parquet)"""
+        if self._parquet is None:
+            return
+        self._buffer.append(row)
+        if len(self._buffer) >= PARQUET_ROW_GROUP_ROWS:
+            self._write_row_group()
+
+    def _write_row_group(self):
+        if self._parquet is not None and self._buffer:
+            columns = list(zip(*self._buffer))
+            self._parquet.write_table(pa.table({
+                column: pa.array(values, type=pa.string()) for column, values in zip(RESULT_COLUMNS, columns)
+            }))
+        self._buffer = []
+
+    def close(self):
+        """Flush remaining rows and finalize both files"""
+        self._write_row_group()
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+        self._csv_file.close()
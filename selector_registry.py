@@ -0,0 +1,143 @@
+"""
+FireHox Selector Registry - Self-Healing Selector Order
+Remembers which selector matched for each page element (role), tries the latest
+winner first, and keeps per-selector hit counts and latency across runs
+"""
+
+import json
+import os
+import threading
+import time
+from local_store import atomic_write_json
+
+
+class SelectorRegistry:
+    """
+    role -> candidate selectors, the one that matched most recently first
+    A selector that stops matching (WhatsApp Web UI change) drops behind the first
+    candidate that matches instead - one hit is enough, however long its record;
+    never-matched candidates keep the code order after the proven ones.
+    Thread-safe; counts are merged into the stats file on save(), so the app
+    and the campaign worker can both record hits.
+    """
+
+    def __init__(self, defaults, path=None):
+        """defaults: dict role -> list of selectors in the preferred starting order"""
+        self.defaults = {role: list(selectors) for role, selectors in defaults.items()}
+        self.path = path
+        self._lock = threading.Lock()
+        self._totals = self._empty()
+        self._pending = self._empty()
+        self._loaded = path is None
+
+    def _empty(self):
+        return {role: {'misses': 0, 'selectors': {}} for role in self.defaults}
+
+    def _read_file(self):
+        """Persisted totals, limited to the roles and selectors still defined in code"""
+        totals = self._empty()
+        if not self.path or not os.path.exists(self.path):
+            return totals
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable selector stats: {e}")
+            return totals
+        for role, entry in saved.items():
+            if role not in totals:
+                continue
+            totals[role]['misses'] = entry.get('misses', 0)
+            for selector, counts in entry.get('selectors', {}).items():
+                if selector in self.defaults[role]:
+                    # [hits, seconds, last hit time]; files from before last hit times have two fields
+                    totals[role]['selectors'][selector] = [counts[0], counts[1], counts[2] if len(counts) > 2 else 0.0]
+        return totals
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self._loaded = True
+            self._totals = self._read_file()
+
+    def _merged(self, role):
+        """Loaded totals plus unsaved counts for one role"""
+        merged = {'misses': self._totals[role]['misses'] + self._pending[role]['misses'], 'selectors': {}}
+        for source in (self._totals[role]['selectors'], self._pending[role]['selectors']):
+            for selector, (hits, seconds, last_hit) in source.items():
+                current = merged['selectors'].setdefault(selector, [0, 0.0, 0.0])
+                current[0] += hits
+                current[1] += seconds
+                current[2] = max(current[2], last_hit)
+        return merged
+
+    def _order(self, role, counts):
+        """Latest winner first, then by hits; never-matched selectors keep the code order"""
+        return sorted(self.defaults[role], key=lambda selector: (
+            -counts.get(selector, (0, 0.0, 0.0))[2], -counts.get(selector, (0, 0.0, 0.0))[0]
+        ))
+
+    def ordered(self, role):
+        """
+        Returns: the role's selectors, the most recent winner first
+        """
+        with self._lock:
+            self._ensure_loaded()
+            counts = self._merged(role)['selectors']
+        return self._order(role, counts)
+
+    def record_hit(self, role, selector, seconds):
+        """Count a match for `selector` that took `seconds` to appear"""
+        with self._lock:
+            entry = self._pending[role]['selectors'].setdefault(selector, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = time.time()
+
+    def record_miss(self, role):
+        """Count a lookup where no selector of the role matched"""
+        with self._lock:
+            self._pending[role]['misses'] += 1
+
+    def stats(self):
+        """
+        Returns: dict role -> {'lookups', 'hit_rate', 'selectors': [(selector, hits, avg_ms)]}
+        with selectors in the order they are tried (includes counts other processes saved)
+        """
+        with self._lock:
+            self._totals = self._read_file()
+            self._loaded = True
+            merged = {role: self._merged(role) for role in self.defaults}
+        report = {}
+        for role, entry in merged.items():
+            hits = sum(count for count, _, _ in entry['selectors'].values())
+            lookups = hits + entry['misses']
+            selectors = []
+            for selector in self._order(role, entry['selectors']):
+                count, seconds, _ = entry['selectors'].get(selector, (0, 0.0, 0.0))
+                selectors.append((selector, count, round(seconds / count * 1000, 1) if count else None))
+            report[role] = {
+                'lookups': lookups,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'selectors': selectors,
+            }
+        return report
+
+    def save(self):
+        """
+        Merge unsaved counts into the stats file (no-op when created without a path)
+        Returns: (success: bool, message: str)
+        """
+        if self.path is None:
+            return True, "Selector stats are memory-only"
+        try:
+            with self._lock:
+                # Re-read so counts saved by another process since our load are kept
+                self._totals = self._read_file()
+                self._loaded = True
+                merged = {role: self._merged(role) for role in self.defaults}
+                atomic_write_json(self.path, merged, indent=1)
+                self._totals = merged
+                self._pending = self._empty()
+            return True, "✅ Selector stats saved"
+        except OSError as e:
+            return False, f"⚠️ Could not save selector stats: {e}"
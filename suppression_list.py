@@ -0,0 +1,127 @@
+"""
+FireHox Suppression List - Do-Not-Contact Numbers
+Opt-outs stored as a sorted int64 array on disk, applied by clean_data as a vectorized anti-join
+"""
+
+import os
+import threading
+import numpy as np
+import pandas as pd
+from whatsapp_engine import WhatsAppBot
+from lead_loader import read_csv
+from local_store import atomic_write
+
+# Next to the contact history - survives app restarts
+SUPPRESSION_LIST_FILE = "./firehox_suppression.npy"
+
+
+def e164_to_int(phones):
+    """
+    E.164 strings ('+919876543210') as int64 keys (919876543210)
+    E.164 numbers have at most 15 digits, so every valid number fits.
+    Returns: int64 numpy array aligned with `phones` (-1 where a value is not E.164)
+    """
+    digits = pd.Series(phones, dtype=object).str.slice(1)
+    keys = pd.to_numeric(digits, errors='coerce')
+    return keys.fillna(-1).to_numpy(dtype=np.int64)
+
+
+class SuppressionList:
+    """
+    Do-not-contact list: sorted, unique int64 E.164 numbers in one .npy file
+    A million opt-outs take 8 MB and membership for a whole upload is one
+    np.searchsorted call (binary search per lead, no Python loop).
+    """
+
+    def __init__(self, path=SUPPRESSION_LIST_FILE):
+        self.path = path
+        self._numbers = None
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        """Load the on-disk list on first use"""
+        if self._numbers is None:
+            if self.path and os.path.exists(self.path):
+                self._numbers = np.load(self.path)
+            else:
+                self._numbers = np.empty(0, dtype=np.int64)
+        return self._numbers
+
+    def _store(self, numbers):
+        """Replace the list and write it atomically so a crash never leaves a partial file"""
+        self._numbers = numbers
+        if self.path:
+            atomic_write(self.path, lambda f: np.save(f, numbers), binary=True)
+
+    def add(self, phones):
+        """
+        Suppress E.164 numbers
+        Returns: number of numbers that were not suppressed before
+        """
+        keys = e164_to_int(phones)
+        keys = keys[keys >= 0]
+        with self._lock:
+            current = self._ensure_loaded()
+            merged = np.union1d(current, keys)
+            added = len(merged) - len(current)
+            if added:
+                self._store(merged)
+        return added
+
+    def import_frame(self, dataframe, default_country_code="+91", phone_col=None):
+        """
+        Suppress every number in an opt-out table, normalized exactly like leads in clean_data
+        Returns: (success, message)
+        """
+        opt_outs, report = WhatsAppBot.clean_data(
+            dataframe, default_country_code, phone_col=phone_col, phone_cache=None
+        )
+        if opt_outs is None:
+            return False, report.get('error', "No valid numbers found")
+        added = self.add(opt_outs['Phone'])
+        return True, f"✅ {added:,} new numbers suppressed ({report['valid_rows']:,} valid, {report['invalid_rows']:,} invalid in file)"
+
+    def import_csv(self, csv_file, default_country_code="+91", phone_col=None):
+        """
+        Suppress every number in an opt-out CSV (uploaded file or open binary file)
+        Returns: (success, message)
+        """
+        try:
+            dataframe = read_csv(csv_file, dtype=str)
+        except Exception as e:
+            return False, f"❌ Could not read opt-out file: {str(e)}"
+        return self.import_frame(dataframe, default_country_code, phone_col)
+
+    def suppressed_mask(self, phones):
+        """
+        Bulk membership test (anti-join input)
+        Returns: boolean numpy array aligned with `phones`, True where the number opted out
+        """
+        with self._lock:
+            numbers = self._ensure_loaded()
+        keys = e164_to_int(phones)
+        if len(numbers) == 0 or len(keys) == 0:
+            return np.zeros(len(keys), dtype=bool)
+        positions = np.searchsorted(numbers, keys).clip(max=len(numbers) - 1)
+        return numbers[positions] == keys
+
+    def count(self):
+        with self._lock:
+            return len(self._ensure_loaded())
+
+    def fingerprint(self):
+        """Changes whenever the list changes - used as part of cache keys for cleaning results"""
+        with self._lock:
+            numbers = self._ensure_loaded()
+            if len(numbers) == 0:
+                return (0,)
+            return (len(numbers), int(numbers[0]), int(numbers[-1]), int(np.bitwise_xor.reduce(numbers)))
+
+    def clear(self):
+        """Remove every suppressed number"""
+        with self._lock:
+            self._store(np.empty(0, dtype=np.int64))
+
+
+# Shared list used by the app
+SUPPRESSION_LIST = SuppressionList()
@@ -4,6 +4,7 @@ FIXED: Singleton Lock Issue with Open-Close-Reopen Architecture
 """
 
 import pandas as pd
+import numpy as np
 import phonenumbers
 from phonenumbers import NumberParseException
 import random
@@ -11,9 +12,22 @@ import time
 from urllib.parse import quote
 import os
 import shutil
+import signal
+import socket
 import sys
 import asyncio
 import subprocess
+import multiprocessing
+import json
+import re
+import threading
+from functools import lru_cache
+from contextlib import contextmanager
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from column_detection import detect_columns
+from selector_registry import SelectorRegistry
+from local_store import atomic_write_json
 
 # ==================== PYTHON 3.13 COMPATIBILITY FIX ====================
 if sys.platform == 'win32' and sys.version_info >= (3, 13):
@@ -26,77 +40,655 @@ from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeo
 # Constants - Isolated Session Directory
 USER_DATA_DIR = "./firehox_wa_session"
 
+# Chromium's profile lock - waits only happen while a live browser still holds it
+SINGLETON_LOCK_WAIT_SECONDS = 5
+SINGLETON_LOCK_POLL_SECONDS = 0.1
+
+# Parallel validation - below this many unique numbers a process pool costs more than it saves
+PARALLEL_VALIDATION_THRESHOLD = 20000
+
+# Phone normalization cache - survives Streamlit reruns and (optionally) app restarts
+PHONE_CACHE_FILE = "./firehox_phone_cache.json"
+PHONE_CACHE_SIZE = 500000
+
+# Compact storage for cleaned leads kept in session state:
+# Arrow-backed strings when pyarrow is installed - Streamlit depends on it - (E.164 phones are <= 16 bytes each,
+# stored back to back instead of as Python objects) and categorical status columns
+try:
+    import pyarrow  # noqa: F401
+    COMPACT_STRING_DTYPE = "string[pyarrow]"
+except ImportError:
+    COMPACT_STRING_DTYPE = "string"
+CATEGORICAL_COLUMNS = ('Status',)
+
+# WhatsApp Web selectors, in priority order per page element
+LOGGED_IN_SELECTORS = [
+    '#side',
+    'div[data-testid="chat-list"]',
+    'header[data-testid="chatlist-header"]',
+    'span[data-icon="search"]',
+]
+INVALID_NUMBER_SELECTORS = [
+    "div[data-testid='invalid-number']",
+    "text=Phone number shared via url is invalid",
+    "text=The phone number is invalid",
+    "text=isn't on WhatsApp",                    # "The number +91... isn't on WhatsApp."
+    "text=not on WhatsApp",                       # Alternative wording
+    "text=number is not registered",              # Older variants
+]
+POPUP_OK_SELECTORS = [
+    'div[role="button"]:has-text("OK")',
+    'button:has-text("OK")',
+    'div[data-testid="popup-controls-ok"]',
+    'div[role="dialog"] div[role="button"]',
+]
+INPUT_BOX_SELECTORS = [
+    'div[contenteditable="true"][data-tab="10"]',
+    'div[aria-label="Type a message"]',
+    'div[title="Type a message"]',
+    'div.lexical-rich-text-input div[contenteditable="true"]',
+    '#main footer div[contenteditable="true"]',
+]
+SEND_BUTTON_SELECTORS = [
+    'span[data-icon="send"]',
+    'button[aria-label="Send"]',
+    'button[data-testid="send"]',
+    'div[data-testid="send"]',
+    '#main footer button span[data-icon="send"]',
+    'footer button',
+]
+# Tick marks inside #main only, so ticks from other chats never match
+SENT_TICK_SELECTORS = [
+    '#main span[data-icon="msg-check"]',      # Single tick
+    '#main span[data-icon="msg-dblcheck"]',   # Double tick
+    '#main span[data-icon="msg-dblcheck-ack"]',  # Blue ticks
+]
+
+# Page element roles for the selector registry (winners are tried first, persisted across runs)
+SELECTOR_ROLES = {
+    'logged_in': LOGGED_IN_SELECTORS,
+    'invalid_number': INVALID_NUMBER_SELECTORS,
+    'popup_ok': POPUP_OK_SELECTORS,
+    'input_box': INPUT_BOX_SELECTORS,
+    'send_button': SEND_BUTTON_SELECTORS,
+    'sent_tick': SENT_TICK_SELECTORS,
+}
+SELECTOR_STATS_FILE = "./firehox_selectors.json"
+
+# Per-phase time budgets (ms) for one send_message call - each wait returns as soon as its
+# state appears, all waits and retries of a phase share its budget, and no phase may
+# outlast what is left of the lead's total budget
+SEND_PHASE_BUDGETS_MS = {
+    'navigate': 45000,        # goto send?phone=...
+    'open_chat': 21000,       # chat input box vs invalid-number dialog
+    'focus_input': 3000,      # click the chat footer and look for the input again
+    'url_injection': 25000,   # reload with ?text= and wait for the chat again
+    'send_button': 5000,
+    'delivery': 5000,         # tick marks vs late "not on WhatsApp" dialog
+}
+# Retries on navigation errors (net::ERR_*, timeouts) while the phase budget allows
+SEND_PHASE_RETRIES = {'navigate': 1, 'url_injection': 1}
+SEND_TOTAL_BUDGET_MS = 60000
+MIN_PHASE_BUDGET_MS = 1000
+POPUP_CLOSE_TIMEOUT_MS = 2000
+
+# Status for numbers dropped before validation (fewer than 5 digits)
+TOO_SHORT_STATUS = "Invalid (Too Short)"
+
+# Rejection histogram bucket for each status clean_data drops
+STATUS_REJECTIONS = {
+    TOO_SHORT_STATUS: 'too_short',
+    "Invalid (Parse Error)": 'parse_error',
+    "Invalid (Format)": 'invalid_format',
+}
+
+
+def pid_alive(pid):
+    """Returns: True if a process with this pid is running (never signals it)"""
+    if not pid or pid <= 0:
+        return False
+    if sys.platform == 'win32':
+        # os.kill(pid, 0) would terminate the process on Windows - ask the kernel instead
+        import ctypes
+        SYNCHRONIZE, WAIT_TIMEOUT = 0x100000, 0x102
+        handle = ctypes.windll.kernel32.OpenProcess(SYNCHRONIZE, False, pid)
+        if not handle:
+            return False
+        try:
+            return ctypes.windll.kernel32.WaitForSingleObject(handle, 0) == WAIT_TIMEOUT
+        finally:
+            ctypes.windll.kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Exists, owned by another user
+    # An exited child the parent hasn't reaped yet still answers signals - it is a zombie
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except (OSError, IndexError):
+        return True
+
+
+def _is_profile_browser(pid, user_data_dir=USER_DATA_DIR):
+    """
+    Returns: True if `pid` is a Chromium running on `user_data_dir`
+    A lock left by an old container names a pid that may since have been reused by
+    anything - the app, the campaign worker, or the process doing the cleanup.
+    """
+    if pid == os.getpid() or not pid_alive(pid):
+        return False
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            command = f.read().decode(errors="replace").replace("\0", " ")
+    except OSError:
+        # No /proc (macOS) - ask ps
+        try:
+            command = subprocess.run(["ps", "-p", str(pid), "-o", "command="],
+                                     capture_output=True, text=True, timeout=5).stdout
+        except (OSError, subprocess.SubprocessError):
+            return False
+    executable = command.split(" --", 1)[0].lower()
+    profiles = {os.path.abspath(user_data_dir), os.path.realpath(user_data_dir)}
+    return "chrom" in executable and any(f"--user-data-dir={profile}" in command for profile in profiles)
+
+
+def _keep_digits_and_plus(phone):
+    """Per-value fallback of the phone cleanup regex for non-ASCII input"""
+    return ''.join(c for c in phone if c.isdigit() or c == '+')
+
+
+def validate_phone(phone_clean):
+    """
+    Parse and validate a single normalized phone string
+    Returns: (phone: str, status: str) - E.164 phone when valid, otherwise the input
+    """
+    try:
+        parsed = phonenumbers.parse(phone_clean, None)
+        if phonenumbers.is_valid_number(parsed):
+            return phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164), "Valid"
+        return phone_clean, "Invalid (Format)"
+    except NumberParseException:
+        return phone_clean, "Invalid (Parse Error)"
+
+
+@lru_cache(maxsize=32)
+def fast_path_pattern(default_country_code):
+    """
+    Precompiled prefix/length regex for the default region's fixed-line and mobile numbers
+    
+    Built straight from phonenumbers' metadata, so a match is exactly what
+    phonenumbers would call a valid number whose E.164 form is the input itself.
+    Anything that does not match (other countries, national prefixes, rare number
+    types) still goes through phonenumbers.
+    Returns: compiled regex, or None when the country code is shared by several
+    regions (e.g. +1) and cannot be classified from the prefix alone
+    """
+    country_code = default_country_code.lstrip('+')
+    if not country_code.isdigit():
+        return None
+    regions = phonenumbers.COUNTRY_CODE_TO_REGION_CODE.get(int(country_code), ())
+    if len(regions) != 1:
+        return None
+    metadata = phonenumbers.PhoneMetadata.metadata_for_region_or_calling_code(int(country_code), regions[0])
+    if metadata is None or metadata.general_desc is None:
+        return None
+    
+    def desc_regex(desc):
+        # Same checks as phonenumbers: possible lengths first, then the full pattern
+        lengths = ''.join(f'(?=[0-9]{{{n}}}$)' if i == 0 else f'|(?=[0-9]{{{n}}}$)' for i, n in enumerate(desc.possible_length))
+        guard = f'(?:{lengths})' if lengths else ''
+        return f'{guard}(?:{desc.national_number_pattern})$'
+    
+    type_regexes = [
+        desc_regex(desc) for desc in (metadata.mobile, metadata.fixed_line)
+        if desc is not None and desc.national_number_pattern
+    ]
+    if not type_regexes:
+        return None
+    
+    # ASCII digits only, no leading zero, and nothing phonenumbers would strip as a national prefix
+    national_prefix = metadata.national_prefix_for_parsing
+    no_prefix = f'(?!{national_prefix})' if national_prefix else ''
+    return re.compile(
+        rf'^\+{country_code}(?=[1-9][0-9]*$){no_prefix}'
+        rf'(?={desc_regex(metadata.general_desc)})'
+        rf'(?:{"|".join(f"(?:{r})" for r in type_regexes)})'
+    )
+
+
+def _first_seen(values, seen_runs):
+    """
+    Mark values not seen before, using 64-bit hashes (8 bytes per distinct value kept)
+    Duplicates inside `values` count as seen after their first occurrence.
+    seen_runs: list of sorted hash arrays, largest first. Each call adds its new hashes
+    as one run and merges it only with runs no bigger than itself (like carrying in a
+    binary counter), so a hash is copied O(log n) times over the whole file and a lookup
+    is one binary search per run (O(log n) runs). A chunk late in a multi-GB file costs
+    a few more searches than one at its start; the whole history is copied only by the
+    rare merge into the largest run, not by every chunk.
+    Returns: (boolean mask aligned with values, updated seen_runs)
+    """
+    hashes = pd.util.hash_array(values.to_numpy(dtype=object))
+    is_new = ~pd.Series(hashes).duplicated().to_numpy()
+    # Sorted needles walk each run front to back, which keeps the searches cache-friendly
+    order = np.argsort(hashes)
+    sorted_hashes = hashes[order]
+    for run in seen_runs:
+        positions = np.searchsorted(run, sorted_hashes)
+        is_new[order[run[np.minimum(positions, len(run) - 1)] == sorted_hashes]] = False
+    run = sorted_hashes[is_new[order]]
+    while seen_runs and len(seen_runs[-1]) <= len(run):
+        # Both runs are sorted, so the stable sort (timsort) just merges them
+        run = np.sort(np.concatenate((seen_runs.pop(), run)), kind='stable')
+    if len(run):
+        seen_runs.append(run)
+    return is_new, seen_runs
+
+
+def _validate_chunk(numbers):
+    """Process pool entry point - validate one chunk of normalized numbers"""
+    return [validate_phone(number) for number in numbers]
+
+
+def validate_phones(numbers, workers=1, parallel_threshold=PARALLEL_VALIDATION_THRESHOLD):
+    """
+    Validate a list of normalized phone strings, optionally across CPU cores
+    
+    workers: number of processes to use (None = all CPU cores, 1 = no pool)
+    parallel_threshold: stay single-process below this many numbers
+    Returns: list of (phone, status) tuples in the same order as `numbers`
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    
+    if workers <= 1 or len(numbers) < parallel_threshold:
+        return _validate_chunk(numbers)
+    
+    # A few chunks per worker keeps the pool busy when some chunks parse slower
+    chunk_size = -(-len(numbers) // (workers * 4))
+    chunks = [numbers[i:i + chunk_size] for i in range(0, len(numbers), chunk_size)]
+    
+    # 'spawn' avoids forking the Streamlit server together with its threads
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        results = []
+        for chunk_result in executor.map(_validate_chunk, chunks):
+            results.extend(chunk_result)
+    return results
+
+
+class PhoneCache:
+    """
+    Bounded LRU cache: (raw_phone, default_country_code) -> (E164, status)
+    Thread-safe, since Streamlit sessions share the module-level instance.
+    """
+    
+    def __init__(self, maxsize=PHONE_CACHE_SIZE, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._loaded = path is None
+        self._dirty = False  # Entries changed since the last save
+    
+    def _ensure_loaded(self):
+        """Lazily load the persisted cache the first time it is used"""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for raw, country_code, phone, status in json.load(f):
+                    self._entries[(raw, country_code)] = (phone, status)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            print(f"📦 Loaded {len(self._entries)} cached phone numbers")
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable phone cache: {e}")
+            self._entries.clear()
+    
+    def get_many(self, raw_phones, default_country_code):
+        """
+        Look up many raw phones at once
+        Returns: dict raw_phone -> (E164, status) for the cached ones only
+        """
+        found = {}
+        with self._lock:
+            self._ensure_loaded()
+            for raw in raw_phones:
+                key = (raw, default_country_code)
+                result = self._entries.get(key)
+                if result is not None:
+                    self._entries.move_to_end(key)
+                    found[raw] = result
+            self.hits += len(found)
+            self.misses += len(raw_phones) - len(found)
+        return found
+    
+    def put_many(self, results, default_country_code):
+        """Store a dict of raw_phone -> (E164, status), evicting least recently used entries"""
+        with self._lock:
+            self._ensure_loaded()
+            for raw, result in results.items():
+                key = (raw, default_country_code)
+                self._entries[key] = result
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            if results:
+                self._dirty = True
+    
+    def save(self):
+        """
+        Persist the cache to disk (no-op when created without a path or when
+        nothing was added since the last save - e.g. a cached clean_upload rerun)
+        Returns: (success: bool, message: str)
+        """
+        if self.path is None:
+            return True, "Phone cache is memory-only"
+        try:
+            with self._lock:
+                if not self._dirty:
+                    return True, "Phone cache unchanged"
+                rows = [[raw, code, phone, status] for (raw, code), (phone, status) in self._entries.items()]
+                self._dirty = False
+            atomic_write_json(self.path, rows)
+            return True, f"✅ Saved {len(rows)} cached phone numbers"
+        except OSError as e:
+            self._dirty = True  # Try again on the next save
+            return False, f"⚠️ Could not save phone cache: {e}"
+    
+    def clear(self):
+        """Drop all entries and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self._loaded = True
+            self._dirty = True
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self):
+        """Returns: dict with hits, misses, hit_rate and current size"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self._entries),
+        }
+
+
+# Shared cache used by clean_data unless another one is passed in
+PHONE_CACHE = PhoneCache(path=PHONE_CACHE_FILE)
+
+# Shared selector order and hit statistics (saved when the browser closes)
+SELECTOR_REGISTRY = SelectorRegistry(SELECTOR_ROLES, path=SELECTOR_STATS_FILE)
+
+
+class CleaningStats:
+    """
+    Wall-clock time per pipeline stage and a histogram of why rows were dropped,
+    collected over one clean_data / clean_data_stream run
+    """
+    
+    STAGES = ('detection', 'stringify', 'filtering', 'dedupe', 'normalization', 'validation')
+    REJECTIONS = ('blank', 'duplicate', 'too_short', 'parse_error', 'invalid_format', 'suppressed', 'already_contacted')
+    
+    def __init__(self):
+        self.seconds = dict.fromkeys(self.STAGES, 0.0)
+        self.rejections = dict.fromkeys(self.REJECTIONS, 0)
+    
+    @contextmanager
+    def stage(self, name):
+        """Add the time spent in the block to `name` (stages repeat once per chunk when streaming)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - start
+    
+    def reject(self, reason, count):
+        self.rejections[reason] += int(count)
+    
+    def report(self):
+        """Returns: dict with 'stage_seconds' and 'rejections' for the data report"""
+        return {
+            'stage_seconds': {name: round(seconds, 4) for name, seconds in self.seconds.items()},
+            'rejections': dict(self.rejections),
+        }
+
+
+class TerminalSendState(Exception):
+    """Raised inside send_message when a lead is resolved for good (e.g. invalid number)"""
+    
+    def __init__(self, status):
+        super().__init__(status)
+        self.status = status
+
+
+class SendPolicy:
+    """
+    Time budgets and retries for the phases of one send_message call
+    A phase gets its own budget, capped by what is left of the lead's total budget;
+    fallback phases that come up with less than MIN_PHASE_BUDGET_MS left are skipped,
+    so a dead lead can never run through every fallback at full length.
+    """
+    
+    def __init__(self, budgets=None, retries=None, total_ms=SEND_TOTAL_BUDGET_MS):
+        self.budgets = dict(SEND_PHASE_BUDGETS_MS, **(budgets or {}))
+        self.retries = dict(SEND_PHASE_RETRIES, **(retries or {}))
+        self.deadline = time.monotonic() + total_ms / 1000
+        self._phase_deadlines = {}
+    
+    def remaining_ms(self):
+        return max(0.0, (self.deadline - time.monotonic()) * 1000)
+    
+    def budget(self, phase):
+        """
+        Returns: ms the phase may use right now (0 when the phase or the lead is out of time)
+        The phase's clock starts the first time it is asked for, so a navigation and the
+        wait after it (or a retry) draw on the same budget.
+        """
+        now = time.monotonic()
+        phase_deadline = self._phase_deadlines.setdefault(phase, now + self.budgets[phase] / 1000)
+        budget = (min(phase_deadline, self.deadline) - now) * 1000
+        return budget if budget >= MIN_PHASE_BUDGET_MS else 0
+    
+    def run(self, phase, action):
+        """
+        Call action(timeout_ms), retrying Playwright errors up to the phase's retry count
+        while the budget allows; the last error is re-raised
+        """
+        attempts = 1 + self.retries.get(phase, 0)
+        for attempt in range(attempts):
+            timeout_ms = self.budget(phase)
+            if not timeout_ms:
+                raise PlaywrightTimeout(f"No time left for {phase}")
+            try:
+                return action(timeout_ms)
+            except PlaywrightError as e:
+                if attempt == attempts - 1:
+                    raise
+                print(f"🔁 Retrying {phase}: {str(e)[:80]}")
+
 
 class WhatsAppBot:
     """WhatsApp automation bot with Open-Close-Reopen architecture"""
     
     def __init__(self):
         self.playwright = None
+        self.browser = None  # Set when attached to the browser host over CDP
         self.context = None
         self.page = None
     
+    @staticmethod
+    def _remove_stale_lock(lock_file):
+        """
+        Remove the profile's SingletonLock if no live browser holds it
+        POSIX: the lock is a symlink to "<hostname>-<pid>", so the owner is checked directly
+        (a lock from another hostname, or whose pid is not a Chromium on this profile, is
+        left over from an old container and is stale);
+        Windows: the browser keeps the file open, so a failed delete means it is held
+        Returns: pid of the live owner (0 if unknown), or None when the profile is free
+        """
+        if not os.path.lexists(lock_file):
+            return None
+        
+        if sys.platform != 'win32':
+            try:
+                target = os.readlink(lock_file)
+            except OSError:
+                target = ""
+            hostname, _, pid = target.rpartition('-')
+            if hostname == socket.gethostname() and pid.isdigit() and _is_profile_browser(int(pid)):
+                return int(pid)
+        
+        try:
+            os.remove(lock_file)
+        except FileNotFoundError:
+            return None
+        except PermissionError:
+            return 0
+        # Chromium's companion singleton links are just as stale as the lock
+        for name in ("SingletonSocket", "SingletonCookie"):
+            try:
+                os.remove(os.path.join(os.path.dirname(lock_file), name))
+            except OSError:
+                pass
+        print("✅ Removed stale lock file")
+        return None
+    
+    @staticmethod
+    def _wait_for_lock_release(lock_file, timeout=SINGLETON_LOCK_WAIT_SECONDS):
+        """
+        Poll (bounded) while a live browser still holds the profile lock
+        Returns: None once the profile is free, else the owner pid (0 if unknown)
+        """
+        deadline = time.monotonic() + timeout
+        owner = WhatsAppBot._remove_stale_lock(lock_file)
+        while owner is not None and time.monotonic() < deadline:
+            time.sleep(SINGLETON_LOCK_POLL_SECONDS)
+            owner = WhatsAppBot._remove_stale_lock(lock_file)
+        return owner
+    
     @staticmethod
     def force_browser_cleanup():
         """
         CRITICAL: Force cleanup of any zombie browser processes and locks
         This MUST be called before launching browser to prevent SingletonLock errors
+        Stale locks are removed at once; only a live owner is waited for (bounded), then closed.
         Returns: (success: bool, message: str)
         """
         try:
             print("🧹 Starting browser cleanup...")
             
-            # Step 1: Check for SingletonLock file
+            # Step 1: Check who holds the SingletonLock
             lock_file = os.path.join(USER_DATA_DIR, "SingletonLock")
+            owner = WhatsAppBot._remove_stale_lock(lock_file)
+            if owner is None:
+                return True, "✅ Cleanup successful"
             
-            if os.path.exists(lock_file):
-                print(f"⚠️ Found lock file: {lock_file}")
-                
-                # Retry removing the lock file a few times with backoff
-                for attempt in range(3):
-                    try:
-                        os.remove(lock_file)
-                        print("✅ Successfully removed lock file")
-                        break
-                    except PermissionError:
-                        if attempt < 2:
-                            print(f"⚠️ Lock file is in use, retrying in {attempt + 1}s...")
-                            time.sleep(attempt + 1)
-                        else:
-                            # Final attempt: try platform-specific cleanup of Playwright chromium only
-                            print("⚠️ Lock file still in use. Attempting to close Playwright browser...")
-                            try:
-                                if sys.platform == 'win32':
-                                    # Only kill chromium (Playwright's browser), not user's Chrome
-                                    subprocess.run(
-                                        "taskkill /F /IM chromium.exe",
-                                        shell=True, stderr=subprocess.DEVNULL, stdout=subprocess.DEVNULL
-                                    )
-                                else:
-                                    # Linux/Mac
-                                    subprocess.run(
-                                        ["pkill", "-f", "chromium"],
-                                        stderr=subprocess.DEVNULL, stdout=subprocess.DEVNULL
-                                    )
-                                
-                                time.sleep(2)
-                                if os.path.exists(lock_file):
-                                    os.remove(lock_file)
-                                print("✅ Playwright browser closed and lock file removed.")
-                            except Exception as kill_err:
-                                return False, (
-                                    "🔒 Browser is locked and could not be force-closed.\n"
-                                    "Please close the Chromium browser window manually and try again.\n"
-                                    f"Error: {kill_err}"
-                                )
-            
-            # Step 2: Wait a moment for OS to release resources
-            time.sleep(1)
+            # Step 2: A browser is still running on the profile - give it a moment in case it is shutting down
+            print(f"⚠️ Lock held by a running browser (pid {owner or 'unknown'}), waiting for it to exit...")
+            owner = WhatsAppBot._wait_for_lock_release(lock_file)
+            if owner is None:
+                return True, "✅ Cleanup successful"
             
-            return True, "✅ Cleanup successful"
+            # Step 3: Still running - close that browser (Playwright's chromium only, never the user's Chrome)
+            print("⚠️ Lock file still in use. Attempting to close Playwright browser...")
+            try:
+                if owner:
+                    os.kill(owner, signal.SIGTERM)
+                elif sys.platform == 'win32':
+                    subprocess.run(
+                        "taskkill /F /IM chromium.exe",
+                        shell=True, stderr=subprocess.DEVNULL, stdout=subprocess.DEVNULL
+                    )
+                else:
+                    subprocess.run(
+                        ["pkill", "-f", "chromium"],
+                        stderr=subprocess.DEVNULL, stdout=subprocess.DEVNULL
+                    )
+                
+                if WhatsAppBot._wait_for_lock_release(lock_file) is not None:
+                    raise RuntimeError("lock still held after closing the browser")
+                print("✅ Playwright browser closed and lock file removed.")
+                return True, "✅ Cleanup successful"
+            except Exception as kill_err:
+                return False, (
+                    "🔒 Browser is locked and could not be force-closed.\n"
+                    "Please close the Chromium browser window manually and try again.\n"
+                    f"Error: {kill_err}"
+                )
             
         except Exception as e:
             return False, f"❌ Cleanup error: {str(e)}"
     
+    @staticmethod
+    def context_options(extra_args=()):
+        """
+        launch_persistent_context keyword arguments shared by launch_browser and the browser host
+        Returns: dict
+        """
+        # Detect cloud environment (Streamlit Cloud uses Linux)
+        is_cloud = sys.platform.startswith("linux")
+        # Set specific viewport for cloud to ensure elements render for screenshots
+        viewport_config = {"width": 1280, "height": 800} if is_cloud else None
+        return dict(
+            user_data_dir=USER_DATA_DIR,
+            headless=is_cloud,  # Run headless on Streamlit Cloud
+            viewport=viewport_config,
+            args=[
+                '--start-maximized',
+                '--disable-blink-features=AutomationControlled',
+                '--no-sandbox',
+                '--disable-setuid-sandbox',
+                '--disable-dev-shm-usage',
+                '--disable-gpu',
+                '--disable-extensions',
+                '--no-first-run',
+                *extra_args,
+            ],
+            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
+            accept_downloads=False,
+            ignore_https_errors=True,
+            java_script_enabled=True
+        )
+    
+    def attach_browser(self, endpoint, timeout=10000):
+        """
+        Attach to the browser host's already-running browser over CDP
+        The WhatsApp Web tab is reused as-is, so there is no cleanup, launch or page load.
+        
+        Returns: (success: bool, message: str, page: Page object or None)
+        """
+        try:
+            self.playwright = sync_playwright().start()
+            self.browser = self.playwright.chromium.connect_over_cdp(endpoint, timeout=timeout)
+            self.context = self.browser.contexts[0]
+            
+            whatsapp_pages = [page for page in self.context.pages if "web.whatsapp.com" in page.url]
+            if whatsapp_pages:
+                self.page = whatsapp_pages[0]
+            else:
+                self.page = self.context.pages[0] if self.context.pages else self.context.new_page()
+                self.page.goto("https://web.whatsapp.com", timeout=60000, wait_until="domcontentloaded")
+            
+            return True, "✅ Attached to the running browser.", self.page
+        except Exception as e:
+            try:
+                if self.playwright: self.playwright.stop()
+            except Exception:
+                pass
+            self.playwright = self.browser = self.context = self.page = None
+            return False, f"❌ Could not attach to the browser host: {str(e)[:200]}", None
+    
     def launch_browser(self):
         """
         Launch isolated persistent browser context
@@ -124,31 +716,8 @@ class WhatsAppBot:
                 return False, "❌ Python 3.13 Compatibility Issue!\n\nPlaywright doesn't fully support Python 3.13 yet.\n\nPlease install Python 3.12 from:\nhttps://www.python.org/downloads/\n\nSee PYTHON_313_FIX.md for detailed instructions.", None
             
             # Launch persistent context
-            # Detect cloud environment (Streamlit Cloud uses Linux)
-            is_cloud = sys.platform.startswith("linux")
-            # Set specific viewport for cloud to ensure elements render for screenshots
-            viewport_config = {"width": 1280, "height": 800} if is_cloud else None
-            
             try:
-                self.context = self.playwright.chromium.launch_persistent_context(
-                    user_data_dir=USER_DATA_DIR,
-                    headless=is_cloud,  # Run headless on Streamlit Cloud
-                    viewport=viewport_config,
-                    args=[
-                        '--start-maximized',
-                        '--disable-blink-features=AutomationControlled',
-                        '--no-sandbox',
-                        '--disable-setuid-sandbox',
-                        '--disable-dev-shm-usage',
-                        '--disable-gpu',
-                        '--disable-extensions',
-                        '--no-first-run',
-                    ],
-                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
-                    accept_downloads=False,
-                    ignore_https_errors=True,
-                    java_script_enabled=True
-                )
+                self.context = self.playwright.chromium.launch_persistent_context(**self.context_options())
             except PlaywrightError as e:
                 error_msg = str(e).lower()
                 if "target closed" in error_msg or "singleton" in error_msg or "lock" in error_msg:
@@ -164,7 +733,8 @@ class WhatsAppBot:
             
             # Navigate to WhatsApp Web
             self.page.goto("https://web.whatsapp.com", timeout=60000, wait_until="domcontentloaded")
-            time.sleep(3)
+            # Settle until the chat list shows (a QR code page just uses the whole wait)
+            self.wait_for_state(['logged_in'], timeout=3000)
             
             return True, "✅ Browser launched successfully! Please scan QR code if prompted.", self.page
             
@@ -188,25 +758,10 @@ class WhatsAppBot:
         try:
             print("⏳ Verifying WhatsApp Web login status...")
             
-            # Selectors specific to logged-in state
-            logged_in_selectors = [
-                '#side',
-                'div[data-testid="chat-list"]',
-                'header[data-testid="chatlist-header"]',
-                'span[data-icon="search"]'
-            ]
-            
-            start_time = time.time()
-            
-            while time.time() - start_time < timeout:
-                for selector in logged_in_selectors:
-                    try:
-                        if self.page.locator(selector).count() > 0:
-                            if self.page.locator(selector).first.is_visible():
-                                return True, "✅ Successfully logged in!"
-                    except Exception:
-                        pass
-                time.sleep(1)
+            # Returns the moment any logged-in marker becomes visible
+            state, _ = self.wait_for_state(['logged_in'], timeout=timeout * 1000)
+            if state == 'logged_in':
+                return True, "✅ Successfully logged in!"
             
             return False, "⏱️ Login verification timed out. If you see chats, use 'Skip Verification'."
             
@@ -217,6 +772,22 @@ class WhatsAppBot:
         """
         Safely close browser and release the SingletonLock
         """
+        if self.browser:
+            # Attached to the browser host: just disconnect - the host keeps the
+            # browser, the WhatsApp tab and the profile lock
+            try:
+                if self.playwright: self.playwright.stop()
+            except Exception:
+                pass
+            self.page = None
+            self.context = None
+            self.browser = None
+            self.playwright = None
+            saved, save_msg = SELECTOR_REGISTRY.save()
+            if not saved:
+                print(save_msg)
+            return True, "✅ Detached from browser host"
+        
         try:
             print("🔒 Closing browser...")
             if self.page: self.page.close()
@@ -227,7 +798,13 @@ class WhatsAppBot:
             self.context = None
             self.playwright = None
             
-            time.sleep(2) # Allow OS to release file locks
+            saved, save_msg = SELECTOR_REGISTRY.save()
+            if not saved:
+                print(save_msg)
+            
+            # Chromium has exited once the context is closed - just confirm the lock is released
+            if self._wait_for_lock_release(os.path.join(USER_DATA_DIR, "SingletonLock")) is not None:
+                print("⚠️ Browser profile is still locked after closing")
             return True, "✅ Browser closed successfully"
         except Exception as e:
             return False, f"⚠️ Error closing browser: {str(e)}"
@@ -238,7 +815,6 @@ class WhatsAppBot:
             close_success, close_msg = self.close_browser()
             if not close_success:
                 print(f"⚠️ Browser close warning: {close_msg}")
-            time.sleep(2)
             if os.path.exists(USER_DATA_DIR):
                 shutil.rmtree(USER_DATA_DIR)
                 return True, "✅ Session reset successfully."
@@ -258,158 +834,393 @@ class WhatsAppBot:
             time.sleep(1)
     
     @staticmethod
-    def clean_data(dataframe, default_country_code="+91", phone_col=None, name_col=None):
+    def _detect_columns(df, phone_col=None, name_col=None):
+        """
+        Robust phone/name column discovery (see column_detection), or manual override
+        Returns: (phone_column, name_column) - phone_column is None when not found
+        """
+        target_phone, target_name, _ = detect_columns(df, phone_col, name_col)
+        return target_phone, target_name
+    
+    @staticmethod
+    def clean_data(dataframe, default_country_code="+91", phone_col=None, name_col=None,
+                   workers=1, parallel_threshold=PARALLEL_VALIDATION_THRESHOLD, phone_cache=PHONE_CACHE,
+                   contact_history=None, suppression_list=None):
         """
         Clean and validate phone number data with robust column detection
+        
+        workers: processes used for phone validation (None = all CPU cores)
+        parallel_threshold: unique-number count below which validation stays single-process
+        phone_cache: PhoneCache memoizing raw phone -> (E164, status), None to disable
+        contact_history: ContactHistory whose numbers are dropped as already contacted, None to keep all
+        suppression_list: SuppressionList of opted-out numbers to drop, None to keep all
         """
         if dataframe is None or dataframe.empty:
             return None, {"error": "Empty dataframe provided"}
         
-        df = dataframe.copy()
+        stats = CleaningStats()
+        with stats.stage('detection'):
+            target_phone, target_name = WhatsAppBot._detect_columns(dataframe, phone_col, name_col)
+        if not target_phone:
+            return None, {"error": "❌ Could not identify the Phone Number column. Please rename it manually to 'Phone'."}
         
-        # Column Discovery (Robust) or Manual Override
-        target_phone = phone_col
-        target_name = name_col
+        # Only the two detected columns are touched - the input frame is never copied or modified
+        phones, names = WhatsAppBot._filter_phones(dataframe[target_phone], dataframe[target_name], stats)
+        initial_count = len(phones)
         
-        cols = [c.lower() for c in df.columns]
+        cleaned_df = WhatsAppBot._normalize_leads(
+            phones, names, default_country_code,
+            workers=workers, parallel_threshold=parallel_threshold, phone_cache=phone_cache, stats=stats
+        )
+
+        if cleaned_df.empty:
+             return None, {"error": "No valid data after cleaning"}
+
+        valid_df = cleaned_df[cleaned_df['Status'] == 'Valid']
+        invalid_count = len(cleaned_df) - len(valid_df)
+        valid_df, _, duplicate_count, suppressed_count, contacted_count = WhatsAppBot._drop_known_leads(
+            valid_df, [], contact_history, suppression_list, stats
+        )
+        valid_df = WhatsAppBot.compact_leads(valid_df)
         
-        # 1. Phone Detection (If not provided)
-        if not target_phone:
-            phone_keywords = ['phone', 'mobile', 'contact', 'tel', 'number', 'whatsapp', 'cell', 'digits', 'ph']
-            for i, col in enumerate(cols):
-                if any(key == col for key in phone_keywords): # Prioritize exact match
-                    target_phone = df.columns[i]
-                    break
-            
-            if not target_phone:
-                for i, col in enumerate(cols):
-                    if any(key in col for key in phone_keywords):
-                        target_phone = df.columns[i]
-                        break
+        report = {
+            'total_rows': initial_count,
+            'valid_rows': len(valid_df),
+            'invalid_rows': invalid_count,
+            'duplicate_rows': duplicate_count,
+            'suppressed_rows': suppressed_count,
+            'already_contacted_rows': contacted_count,
+            'removed_rows': initial_count - len(valid_df),
+            'phone_column': target_phone,
+            'name_column': target_name,
+            **stats.report()
+        }
+        
+        return valid_df, report
 
-        # 2. Name Detection (If not provided - Excludes 'unnamed')
-        if not target_name:
-            name_keywords = ['business', 'company', 'name', 'client', 'customer', 'lead', 'title', 'shop', 'cafe', 'restaurant', 'store']
+    @staticmethod
+    def clean_data_stream(chunks, default_country_code="+91", phone_col=None, name_col=None,
+                          workers=1, parallel_threshold=PARALLEL_VALIDATION_THRESHOLD, phone_cache=PHONE_CACHE,
+                          contact_history=None, suppression_list=None):
+        """
+        Streaming version of clean_data for files too big to load at once
+        
+        chunks: iterable of DataFrames (e.g. pd.read_csv(..., chunksize=N))
+        Columns are detected on the first chunk, duplicates are tracked across
+        chunks, and only the valid rows of each chunk are kept, so peak memory is
+        one chunk plus the result. Returns the same (valid_df, report) as clean_data.
+        """
+        target_phone = target_name = None
+        seen_raw = []
+        seen_e164 = []
+        valid_parts = []
+        initial_count = 0
+        cleaned_count = 0
+        invalid_count = 0
+        duplicate_count = 0
+        suppressed_count = 0
+        contacted_count = 0
+        stats = CleaningStats()
+        
+        for chunk in chunks:
+            if chunk.empty:
+                continue
             
-            # Filter out 'unnamed' columns from potential names
-            valid_name_cols = [c for c in df.columns if 'unnamed' not in c.lower()]
+            if target_phone is None:
+                with stats.stage('detection'):
+                    target_phone, target_name = WhatsAppBot._detect_columns(chunk, phone_col, name_col)
+                if not target_phone:
+                    return None, {"error": "❌ Could not identify the Phone Number column. Please rename it manually to 'Phone'."}
             
-            # Priority 1: Exact matches
-            for col in valid_name_cols:
-                if col.lower() in ['business name', 'name', 'business', 'company name']:
-                    target_name = col
-                    break
+            phones, names = WhatsAppBot._filter_phones(chunk[target_phone], chunk[target_name], stats)
+            
+            # Dedupe across chunks on a 64-bit hash of the raw phone
+            with stats.stage('dedupe'):
+                is_new, seen_raw = _first_seen(phones, seen_raw)
+                stats.reject('duplicate', len(phones) - is_new.sum())
+                phones, names = phones[is_new], names[is_new]
+            initial_count += len(phones)
             
-            # Priority 2: Keyword matches
-            if not target_name:
-                for col in valid_name_cols:
-                    if any(key in col.lower() for key in name_keywords):
-                        target_name = col
-                        break
+            cleaned = WhatsAppBot._normalize_leads(
+                phones, names, default_country_code,
+                workers=workers, parallel_threshold=parallel_threshold, phone_cache=phone_cache, stats=stats
+            )
+            
+            # Keep the row numbering clean_data would have produced for the whole file
+            valid = cleaned[cleaned['Status'] == 'Valid']
+            valid.index = valid.index + cleaned_count
+            cleaned_count += len(cleaned)
+            invalid_count += len(cleaned) - len(valid)
+            
+            valid, seen_e164, duplicates, suppressed, contacted = WhatsAppBot._drop_known_leads(
+                valid, seen_e164, contact_history, suppression_list, stats
+            )
+            duplicate_count += duplicates
+            suppressed_count += suppressed
+            contacted_count += contacted
+            valid_parts.append(valid)
         
-        # Defaults if not found
-        if not target_phone:
-            # Try to find a column with many digits
-            for col in df.columns:
-                sample = str(df[col].iloc[0]) if len(df) > 0 else ""
-                digits = ''.join(c for c in sample if c.isdigit())
-                if len(digits) >= 10:
-                    target_phone = col
-                    break
+        if target_phone is None:
+            return None, {"error": "Empty dataframe provided"}
         
-        if not target_phone:
-            return None, {"error": "❌ Could not identify the Phone Number column. Please rename it manually to 'Phone'."}
+        if cleaned_count == 0:
+             return None, {"error": "No valid data after cleaning"}
         
-        if not target_name:
-            # Default to the first column that isn't the phone column
-            for col in df.columns:
-                if col != target_phone:
-                    target_name = col
-                    break
+        # Empty parts are skipped so they can't downgrade the column dtypes
+        valid_df = WhatsAppBot.compact_leads(pd.concat([part for part in valid_parts if not part.empty] or valid_parts[:1]))
         
-        if not target_name:
-            target_name = target_phone # Last resort
+        report = {
+            'total_rows': initial_count,
+            'valid_rows': len(valid_df),
+            'invalid_rows': invalid_count,
+            'duplicate_rows': duplicate_count,
+            'suppressed_rows': suppressed_count,
+            'already_contacted_rows': contacted_count,
+            'removed_rows': initial_count - len(valid_df),
+            'phone_column': target_phone,
+            'name_column': target_name,
+            **stats.report()
+        }
+        
+        return valid_df, report
+
+    @staticmethod
+    def _drop_known_leads(valid, seen_e164, contact_history=None, suppression_list=None, stats=None):
+        """
+        Drop valid leads whose E.164 number was already seen (in this file), opted out
+        or was contacted before
+        Dedupe runs on the normalized number, so '098765 43210', '919876543210' and
+        '+919876543210' collapse into one lead (the first one wins).
+        Returns: (valid, seen_e164, duplicate_count, suppressed_count, contacted_count)
+        """
+        stats = stats or CleaningStats()
+        with stats.stage('dedupe'):
+            is_new, seen_e164 = _first_seen(valid['Phone'], seen_e164)
+            duplicate_count = int((~is_new).sum())
+            valid = valid[is_new]
             
-        # Data Cleaning
-        df[target_phone] = df[target_phone].astype(str).str.strip()
-        df[target_name] = df[target_name].astype(str).str.strip()
+            suppressed_count = 0
+            if suppression_list is not None and not valid.empty:
+                # Vectorized anti-join against the in-memory do-not-contact array
+                suppressed = suppression_list.suppressed_mask(valid['Phone'])
+                suppressed_count = int(suppressed.sum())
+                valid = valid[~suppressed]
+            
+            contacted_count = 0
+            if contact_history is not None and not valid.empty:
+                # One bulk join against the on-disk index, not a lookup per lead
+                contacted = contact_history.contacted_mask(valid['Phone'])
+                contacted_count = int(contacted.sum())
+                valid = valid[~contacted.to_numpy()]
         
-        # Explicitly handle 'Unnamed' columns to avoid Arrow serialization issues
-        for col in df.columns:
-            if 'unnamed' in col.lower():
-                df[col] = df[col].astype(str)
+        stats.reject('duplicate', duplicate_count)
+        stats.reject('suppressed', suppressed_count)
+        stats.reject('already_contacted', contacted_count)
+        return valid, seen_e164, duplicate_count, suppressed_count, contacted_count
+
+    @staticmethod
+    def compact_leads(df):
+        """
+        Convert a leads/results frame to its compact columnar form
+        Text columns become COMPACT_STRING_DTYPE, low-cardinality columns
+        (CATEGORICAL_COLUMNS) become categoricals. Returns a new frame; values are unchanged.
+        """
+        return df.astype({
+            col: 'category' if col in CATEGORICAL_COLUMNS else COMPACT_STRING_DTYPE
+            for col in df.columns
+        })
+
+    @staticmethod
+    def _filter_phones(phones, names, stats=None):
+        """
+        Strip values, drop blank/'nan' phones and duplicate phones
+        Returns: (phones, names) Series aligned on the surviving rows
+        """
+        stats = stats or CleaningStats()
+        with stats.stage('stringify'):
+            phones = phones.astype(str).str.strip()
+            names = names.astype(str).str.strip()
         
         # Filter out obvious errors
-        df = df[df[target_phone].notna()]
-        df = df[df[target_phone].str.strip() != '']
-        df = df[df[target_phone] != 'nan']
-        df = df.drop_duplicates(subset=[target_phone])
-
-        initial_count = len(df)
+        with stats.stage('filtering'):
+            keep = phones.notna() & (phones.str.strip() != '') & (phones != 'nan')
+            stats.reject('blank', len(keep) - keep.sum())
+            phones, names = phones[keep], names[keep]
         
-        cleaned_phones = []
-        cleaned_names = []
-        statuses = []
+        with stats.stage('dedupe'):
+            keep = ~phones.duplicated()
+            stats.reject('duplicate', len(keep) - keep.sum())
+            return phones[keep], names[keep]
+
+    @staticmethod
+    def _normalize_leads(phones, names, default_country_code="+91",
+                         workers=1, parallel_threshold=PARALLEL_VALIDATION_THRESHOLD, phone_cache=None, stats=None):
+        """
+        Vectorized phone/name normalization for clean_data.
+        All string work runs as pandas column ops in one pass; only the final
+        phonenumbers validity check is done per value (once per unique number).
+        Raw phones already in phone_cache skip normalization entirely.
+        stats: CleaningStats receiving the normalization/validation timings and rejections
+        Returns: DataFrame with Name, Phone, Status for every row that survives
+        the short-number filter (same rows and order as the old per-row loop)
+        """
+        stats = stats or CleaningStats()
         
-        for _, row in df.iterrows():
-            phone = str(row[target_phone]).strip()
-            name = str(row[target_name]).strip()
-            
+        with stats.stage('normalization'):
+            # Names: NaN becomes 'nan' exactly like str(value) did in the row loop
+            names = names.fillna('nan').str.strip()
             # Remove common junk from name (like .csv, numbers if they are just the phone)
-            if name.lower().endswith('.csv'):
-                name = name[:-4]
-            
-            # Basic phone cleanup
-            phone_clean = ''.join(c for c in phone if c.isdigit() or c == '+')
-            
-            if len(phone_clean.replace('+', '')) < 5:
-                continue
+            names = names.mask(names.str.lower().str.endswith('.csv'), names.str[:-4])
+
+            # Resolve each distinct raw phone once - from the cache when possible
+            phones = phones.str.strip()
+            unique_raw = phones.unique().tolist()
+            if phone_cache is not None:
+                resolved = phone_cache.get_many(unique_raw, default_country_code)
+            else:
+                resolved = {}
+            missing = [raw for raw in unique_raw if raw not in resolved]
             
-            try:
-                # Append default country code if missing
-                if not phone_clean.startswith('+'):
-                    # Handle cases where number already has country code but no '+'
-                    if len(phone_clean) > 10 and not phone_clean.startswith('0'):
-                        phone_clean = '+' + phone_clean
-                    else:
-                        phone_clean = default_country_code + phone_clean
+            if missing:
+                phone_clean = WhatsAppBot._normalize_phones(pd.Series(missing, dtype=object), default_country_code)
+                unique_numbers = pd.Series(phone_clean.dropna().unique(), dtype=object)
+        
+        if missing:
+            # Final validity check - the only per-value step, run once per unique number
+            with stats.stage('validation'):
+                validated = {}
                 
-                parsed = phonenumbers.parse(phone_clean, None)
-                if phonenumbers.is_valid_number(parsed):
-                    formatted = phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
-                    cleaned_phones.append(formatted)
-                    cleaned_names.append(name if name and name.lower() != 'nan' else "Business Owner")
-                    statuses.append("Valid")
-                else:
-                    cleaned_phones.append(phone_clean)
-                    cleaned_names.append(name)
-                    statuses.append("Invalid (Format)")
-            except NumberParseException:
-                cleaned_phones.append(phone_clean)
-                cleaned_names.append(name)
-                statuses.append("Invalid (Parse Error)")
+                # Fast path: common numbers of the default region are classified by regex alone
+                fast_pattern = fast_path_pattern(default_country_code)
+                if fast_pattern is not None and len(unique_numbers):
+                    fast_valid = unique_numbers.str.match(fast_pattern.pattern).astype(bool)
+                    validated.update((number, (number, "Valid")) for number in unique_numbers[fast_valid])
+                    unique_numbers = unique_numbers[~fast_valid]
+                
+                unique_numbers = unique_numbers.tolist()
+                validated.update(zip(unique_numbers, validate_phones(unique_numbers, workers, parallel_threshold)))
+            
+            with stats.stage('normalization'):
+                fresh = {
+                    raw: validated[number] if isinstance(number, str) else (None, TOO_SHORT_STATUS)
+                    for raw, number in zip(missing, phone_clean.tolist())
+                }
+                if phone_cache is not None:
+                    phone_cache.put_many(fresh, default_country_code)
+                resolved.update(fresh)
         
-        cleaned_df = pd.DataFrame({
-            'Name': cleaned_names,
-            'Phone': cleaned_phones,
-            'Status': statuses
+        with stats.stage('normalization'):
+            formatted = phones.map({raw: result[0] for raw, result in resolved.items()})
+            statuses = phones.map({raw: result[1] for raw, result in resolved.items()})
+            
+            status_counts = statuses.value_counts()
+            for status, reason in STATUS_REJECTIONS.items():
+                stats.reject(reason, status_counts.get(status, 0))
+            
+            # Drop numbers that are too short to be real
+            long_enough = statuses != TOO_SHORT_STATUS
+            formatted = formatted[long_enough]
+            statuses = statuses[long_enough]
+            names = names[long_enough]
+
+            is_valid = statuses == 'Valid'
+            placeholder = (names == '') | (names.str.lower() == 'nan')
+            names = names.mask(is_valid & placeholder, "Business Owner")
+
+        return pd.DataFrame({
+            'Name': names.to_numpy(),
+            'Phone': formatted.to_numpy(),
+            'Status': statuses.to_numpy()
         })
+
+    @staticmethod
+    def _normalize_phones(phones, default_country_code="+91"):
+        """
+        Vectorized phone cleanup: digit extraction, short-number filter and
+        country-code prefixing
+        Returns: Series of normalized phone strings (None where the number is too short)
+        """
+        # Basic phone cleanup: keep digits and '+'
+        # ASCII values go through a single regex; the rare non-ASCII value keeps
+        # str.isdigit() semantics so unicode digits are treated as before
+        phone_clean = phones.str.replace(r'[^0-9+]', '', regex=True)
+        # (str.contains rather than str.isascii, which needs pandas 3.0)
+        non_ascii = phones.str.contains(r'[^\x00-\x7f]', regex=True, na=False)
+        if non_ascii.any():
+            phone_clean[non_ascii] = phones[non_ascii].map(_keep_digits_and_plus)
         
-        if cleaned_df.empty:
-             return None, {"error": "No valid data after cleaning"}
+        # Append default country code if missing
+        # (numbers longer than 10 digits without a leading 0 already carry a country code)
+        has_plus = phone_clean.str.startswith('+')
+        has_country_code = ~has_plus & (phone_clean.str.len() > 10) & ~phone_clean.str.startswith('0')
+        needs_default = ~has_plus & ~has_country_code
+        long_enough = (phone_clean.str.len() - phone_clean.str.count(r'\+')) >= 5
+        
+        phone_clean = phone_clean.mask(has_country_code, '+' + phone_clean)
+        phone_clean = phone_clean.mask(needs_default, default_country_code + phone_clean)
+        return phone_clean.where(long_enough, None)
 
-        valid_df = cleaned_df[cleaned_df['Status'] == 'Valid'].copy()
+    # ==================== PAGE READINESS ====================
+    def _visible_locator(self, selectors):
+        """One locator matching visible elements of any of the selectors"""
+        locator = None
+        for selector in selectors:
+            candidate = self.page.locator(f"{selector} >> visible=true")
+            locator = candidate if locator is None else locator.or_(candidate)
+        return locator
+    
+    def _matching_selector(self, role):
+        """
+        First selector of a role (registry order) with a visible element right now
+        Returns: (selector, locator of the element), or (None, None)
+        """
+        for selector in SELECTOR_REGISTRY.ordered(role):
+            try:
+                locator = self.page.locator(f"{selector} >> visible=true")
+                if locator.count() > 0:
+                    return selector, locator.first
+            except PlaywrightError:
+                continue
+        return None, None
+    
+    def wait_for_state(self, roles, timeout=15000):
+        """
+        Race several page states with one combined locator and report which appeared
+        Playwright re-checks the combined selector on DOM changes, so this returns
+        as soon as any state is visible instead of after a fixed sleep.
+        The selector that matched is recorded in SELECTOR_REGISTRY with its latency.
         
-        report = {
-            'total_rows': initial_count,
-            'valid_rows': len(valid_df),
-            'invalid_rows': len(cleaned_df) - len(valid_df),
-            'removed_rows': initial_count - len(valid_df),
-            'phone_column': target_phone,
-            'name_column': target_name
-        }
+        roles: SELECTOR_ROLES names; on a tie the first role wins
+        Returns: (role, locator of the visible element), or (None, None) on timeout
+        """
+        combined = self._visible_locator(
+            [selector for role in roles for selector in SELECTOR_REGISTRY.ordered(role)]
+        )
         
-        return valid_df, report
+        started = time.monotonic()
+        deadline = started + timeout / 1000
+        winner, element = None, None
+        while winner is None:
+            remaining_ms = (deadline - time.monotonic()) * 1000
+            if remaining_ms <= 0:
+                break
+            try:
+                combined.first.wait_for(state="attached", timeout=remaining_ms)
+            except PlaywrightTimeout:
+                break
+            
+            for role in roles:
+                selector, element = self._matching_selector(role)
+                if selector:
+                    winner = role
+                    SELECTOR_REGISTRY.record_hit(role, selector, time.monotonic() - started)
+                    break
+            # Otherwise the element vanished between the wait and the check - keep waiting
+        
+        for role in roles:
+            if role != winner:
+                SELECTOR_REGISTRY.record_miss(role)
+        return winner, element
     
     def generate_message(self, business_name):
         """
@@ -474,154 +1285,86 @@ I'd love to show you the demo if you have a minute? Let me know!"""
         templates = [t1, t2, t3, t4]
         return random.choice(templates)
     
-    def _check_invalid_number(self):
-        """
-        Check if WhatsApp is showing an 'invalid number' or 'not on WhatsApp' popup.
-        Returns True if an invalid number indicator is detected, False otherwise.
-        Also clicks the OK/Close button to dismiss the popup if found.
-        """
-        if not self.page:
-            return False
-        
-        # All known invalid-number indicators on WhatsApp Web
-        invalid_selectors = [
-            "div[data-testid='invalid-number']",
-            "text=Phone number shared via url is invalid",
-            "text=The phone number is invalid",
-            "text=isn't on WhatsApp",                    # "The number +91... isn't on WhatsApp."
-            "text=not on WhatsApp",                       # Alternative wording
-            "text=number is not registered",              # Older variants
-        ]
-        
-        for selector in invalid_selectors:
-            try:
-                loc = self.page.locator(selector)
-                if loc.count() > 0 and loc.first.is_visible():
-                    print(f"🚫 Invalid number detected via: {selector}")
-                    # Try to dismiss the popup by clicking OK
-                    self._dismiss_popup()
-                    return True
-            except Exception:
-                continue
-        
-        return False
-    
     def _dismiss_popup(self):
         """Click the OK button on WhatsApp popups to dismiss them."""
-        dismiss_selectors = [
-            'div[role="button"]:has-text("OK")',
-            'button:has-text("OK")',
-            'div[data-testid="popup-controls-ok"]',
-            'div[role="dialog"] div[role="button"]',
-        ]
-        for selector in dismiss_selectors:
-            try:
-                loc = self.page.locator(selector)
-                if loc.count() > 0 and loc.first.is_visible():
-                    loc.first.click()
-                    time.sleep(1)
-                    return
-            except Exception:
-                continue
+        started = time.monotonic()
+        selector, ok_button = self._matching_selector('popup_ok')
+        if not selector:
+            SELECTOR_REGISTRY.record_miss('popup_ok')
+            return
+        SELECTOR_REGISTRY.record_hit('popup_ok', selector, time.monotonic() - started)
+        try:
+            ok_button.click()
+            # Done as soon as the popup is gone
+            self.page.locator('div[role="dialog"]').first.wait_for(state="hidden", timeout=POPUP_CLOSE_TIMEOUT_MS)
+        except Exception:
+            pass  # Popup closed on its own or is still fading out
 
-    def send_message(self, phone, message):
+    def _await_phase(self, policy, phase, roles, invalid_status="Failed (Invalid Number)"):
+        """
+        wait_for_state within a phase's budget, always racing the invalid-number dialog too
+        The dialog is terminal: it is dismissed and TerminalSendState ends the lead at once.
+        Returns: (role, locator), or (None, None) when the phase timed out or had no time left
+        """
+        timeout = policy.budget(phase)
+        if not timeout:
+            print(f"⏭️ Skipping {phase}: lead is out of time")
+            return None, None
+        state, element = self.wait_for_state(['invalid_number'] + roles, timeout=timeout)
+        if state == 'invalid_number':
+            print(f"🚫 Invalid number dialog during {phase}")
+            self._dismiss_popup()
+            raise TerminalSendState(invalid_status)
+        return state, element
+
+    def _type_message(self, message, line_pause=None):
+        """Human-like typing - in WhatsApp Web Enter sends, so newlines are Shift+Enter"""
+        lines = message.split('\n')
+        for i, line in enumerate(lines):
+            if line.strip() != "":
+                self.page.keyboard.type(line, delay=random.randint(5, 12))
+            if i < len(lines) - 1:
+                self.page.keyboard.press("Shift+Enter")
+                if line_pause:
+                    time.sleep(random.uniform(*line_pause))
+
+    def send_message(self, phone, message, policy=None):
         """
         Send message using HUMAN-LIKE TYPING simulation with enhanced selectors
+        policy: SendPolicy with the phase budgets (a fresh default one per call)
         Returns: (status: str, timestamp: str)
         """
         if not self.page:
             return "Failed (No browser)", time.strftime("%Y-%m-%d %H:%M:%S")
         
+        policy = policy or SendPolicy()
         try:
             # Construct URL
             url = f"https://web.whatsapp.com/send?phone={phone}"
             
             # Go to URL
-            self.page.goto(url, timeout=45000, wait_until="domcontentloaded")
+            policy.run('navigate', lambda timeout: self.page.goto(url, timeout=timeout, wait_until="domcontentloaded"))
             
-            # Wait for specific elements to confirm page is usable
-            # We wait for either the chat list, the chat box, or an error message
-            try:
-                self.page.wait_for_selector('div[data-testid="chat-list"], div[data-testid="invalid-number"], div[role="dialog"]', timeout=15000)
-            except Exception:
-                pass  # Continue anyway, sometimes selectors flake
-            
-            # 1. Check for Invalid Number (first pass)
-            invalid_detected = self._check_invalid_number()
-            if invalid_detected:
-                return "Failed (Invalid Number)", time.strftime("%Y-%m-%d %H:%M:%S")
-            
-            # 2. Wait for Input Box (Robust)
-            input_box = None
-            input_selectors = [
-                 'div[contenteditable="true"][data-tab="10"]',
-                 'div[aria-label="Type a message"]',
-                 'div[title="Type a message"]',
-                 'div.lexical-rich-text-input div[contenteditable="true"]',
-                 '#main footer div[contenteditable="true"]'
-            ]
-            
-            # Try to find input box with retries
-            for attempt in range(3): # 3 attempts
-                # Re-check for invalid number popup on each retry
-                # (the popup often appears AFTER a delay)
-                invalid_detected = self._check_invalid_number()
-                if invalid_detected:
-                    return "Failed (Invalid Number)", time.strftime("%Y-%m-%d %H:%M:%S")
-                
-                for selector in input_selectors:
-                    try:
-                        loc = self.page.locator(selector)
-                        if loc.count() > 0 and loc.first.is_visible():
-                            input_box = loc.first
-                            break
-                    except Exception:
-                        continue
-                if input_box: break
-                time.sleep(2)
+            # 1. Race the two outcomes: chat ready (input box) vs invalid-number popup
+            # (the popup often appears after a delay, so both are watched for the whole wait)
+            _, input_box = self._await_phase(policy, 'open_chat', ['input_box'])
             
-            if not input_box:
-                # One final invalid number check before giving up
-                invalid_detected = self._check_invalid_number()
-                if invalid_detected:
-                    return "Failed (Invalid Number)", time.strftime("%Y-%m-%d %H:%M:%S")
-                
+            if not input_box and policy.budget('focus_input'):
                 # Urgent Fallback: Click on the main chat area if possible
                 try:
-                    self.page.click('#main footer', timeout=5000)
-                    time.sleep(1)
-                    # Re-search
-                    for selector in input_selectors:
-                        loc = self.page.locator(selector)
-                        if loc.count() > 0:
-                            input_box = loc.first
-                            break
-                except Exception:
+                    self.page.click('#main footer', timeout=policy.budget('focus_input'))
+                    _, input_box = self._await_phase(policy, 'focus_input', ['input_box'])
+                except PlaywrightError:
                     pass
 
             if not input_box:
                 print("⚠️ Input box not found, falling back to URL injection.")
                 encoded_message = quote(message)
                 url_with_text = f"https://web.whatsapp.com/send?phone={phone}&text={encoded_message}"
-                self.page.goto(url_with_text, timeout=30000)
-                time.sleep(5)
-                
-                # Check for invalid number AGAIN after URL reload
-                invalid_detected = self._check_invalid_number()
-                if invalid_detected:
-                    return "Failed (Invalid Number)", time.strftime("%Y-%m-%d %H:%M:%S")
-                
-                # Try to find input box after URL injection
-                fallback_input = None
-                for selector in input_selectors:
-                    try:
-                        loc = self.page.locator(selector)
-                        if loc.count() > 0 and loc.first.is_visible():
-                            fallback_input = loc.first
-                            break
-                    except Exception:
-                        continue
+                policy.run('url_injection', lambda timeout: self.page.goto(url_with_text, timeout=timeout))
                 
+                # Same race after the reload
+                _, fallback_input = self._await_phase(policy, 'url_injection', ['input_box'])
                 if not fallback_input:
                     return "Failed (No chat loaded)", time.strftime("%Y-%m-%d %H:%M:%S")
                 
@@ -630,91 +1373,39 @@ I'd love to show you the demo if you have a minute? Let me know!"""
                 time.sleep(0.5)
                 self.page.keyboard.press("Control+A") # Select any existing text
                 self.page.keyboard.press("Backspace") # Clear
-                
-                # Typing with Shift+Enter handling
-                lines = message.split('\n')
-                for i, line in enumerate(lines):
-                    if line.strip() != "":
-                        self.page.keyboard.type(line, delay=random.randint(5, 12))
-                    if i < len(lines) - 1:
-                        self.page.keyboard.press("Shift+Enter")
+                self._type_message(message)
                 time.sleep(2)
             else:
                 # Input box found -> TYPE MESSAGE
                 input_box.click()
                 time.sleep(1)
-                
-                # Human-like typing with Shift+Enter handling for newlines
-                lines = message.split('\n')
-                for i, line in enumerate(lines):
-                    if line.strip() != "":
-                        self.page.keyboard.type(line, delay=random.randint(5, 12))
-                    
-                    if i < len(lines) - 1:
-                        # In WhatsApp Web, Enter sends. Shift+Enter adds a newline.
-                        self.page.keyboard.press("Shift+Enter")
-                        time.sleep(random.uniform(0.1, 0.3))
-                        
+                self._type_message(message, line_pause=(0.1, 0.3))
                 time.sleep(random.uniform(1.5, 3))
             
-            # 3. Locate and Click Send Button
-            # We try multiple times because the button can take a split second to activate after typing
-            send_button = None
-            send_button_selectors = [
-                'span[data-icon="send"]',
-                'button[aria-label="Send"]',
-                'button[data-testid="send"]',
-                'div[data-testid="send"]',
-                '#main footer button span[data-icon="send"]',
-                'footer button'
-            ]
-            
-            for _ in range(5): # Up to 5 retries for the button
-                for selector in send_button_selectors:
-                    try:
-                        loc = self.page.locator(selector)
-                        if loc.count() > 0 and loc.first.is_visible():
-                            send_button = loc.first
-                            break
-                    except Exception: continue
-                if send_button: break
-                time.sleep(1)
+            # 2. Locate and Click Send Button
+            # It can take a split second to activate after typing - returns as soon as it is visible
+            _, send_button = self._await_phase(policy, 'send_button', ['send_button'])
             
             if send_button:
                 time.sleep(random.uniform(1, 2)) # Human pause
                 send_button.click()
-                time.sleep(3) # Wait for message to move to chat
             else:
                 # Try pressing ENTER as a last resort
                 # Make sure we're focused on the input
                 if input_box: input_box.click() 
                 self.page.keyboard.press("Enter")
-                time.sleep(3)
-            
-            # 4. Post-send: check one more time for "not on WhatsApp" popup
-            # (WhatsApp sometimes shows this AFTER you try to send)
-            invalid_detected = self._check_invalid_number()
-            if invalid_detected:
-                return "Failed (Not on WhatsApp)", time.strftime("%Y-%m-%d %H:%M:%S")
-            
-            # 5. FINAL VERIFICATION: Check for sent tick marks in the CURRENT conversation only
-            # Look specifically inside #main to avoid matching ticks from other chats
-            success_indicators = [
-                '#main span[data-icon="msg-check"]',      # Single tick
-                '#main span[data-icon="msg-dblcheck"]',   # Double tick
-                '#main span[data-icon="msg-dblcheck-ack"]'# Blue ticks
-            ]
-            
-            for selector in success_indicators:
-                try:
-                    if self.page.locator(selector).count() > 0:
-                        return "Sent ✅", time.strftime("%Y-%m-%d %H:%M:%S")
-                except Exception:
-                    continue
+            
+            # 3. Post-send: wait for the message to land in the chat (tick marks) or for a
+            # "not on WhatsApp" popup (WhatsApp sometimes shows this AFTER you try to send)
+            state, _ = self._await_phase(policy, 'delivery', ['sent_tick'], invalid_status="Failed (Not on WhatsApp)")
+            if state == 'sent_tick':
+                return "Sent ✅", time.strftime("%Y-%m-%d %H:%M:%S")
             
             # If we reached here, we sent it but can't see the tick yet (slow network)
             return "Sent (Pending) ⏳", time.strftime("%Y-%m-%d %H:%M:%S")
                 
+        except TerminalSendState as e:
+            return e.status, time.strftime("%Y-%m-%d %H:%M:%S")
         except PlaywrightTimeout:
             return "Failed (Timeout)", time.strftime("%Y-%m-%d %H:%M:%S")
         except Exception as e: